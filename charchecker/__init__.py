@@ -0,0 +1,15 @@
+# The library API is imported on first use, so `python -m charchecker` and
+# the quick entry point don't pay for it at startup.
+__all__ = ["CharRules", "Violation", "iter_violations"]
+
+
+def __getattr__(name):
+    if name == "CharRules":
+        from .rules import CharRules
+
+        return CharRules
+    if name in ("Violation", "iter_violations"):
+        from . import violations
+
+        return getattr(violations, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,47 +1,29 @@
 import logging
-import logging.config
 import os
 from datetime import datetime
 from time import localtime, strftime
 
-import yaml
-
 from .argparser import build_parser
-from .check_path import check_path
+from .rules import DEFAULT_CHARACTERS
 
 logger = logging.getLogger(__name__)
 
-illegal_chars = [
-    "|",
-    "/",
-    ";",
-    ":",
-    "'",
-    '"',
-    "@",
-    ",",
-    "!",
-    "#",
-    "$",
-    "%",
-    "^",
-    "&",
-    "=",
-    "<",
-    ">",
-    "{",
-    "}",
-    "*",
-    "?",
-    "~",
-    "+",
-]
-
-
-def set_logger():
+# the characters checked for when no -c is given
+illegal_chars = DEFAULT_CHARACTERS
+
+
+def set_logger(queue=False):
     """
     Setup logging configuration
+    With queue=True the handlers are moved behind a queue so logging never
+    blocks the check on console or file I/O; the listener is returned and
+    must be stopped at the end of the run.
     """
+    # yaml and the logging config are only needed once logging is set up
+    import logging.config
+
+    import yaml
+
     path = os.path.join("logging.yaml")
 
     with open(path, "rt") as f:
@@ -61,14 +43,19 @@ def set_logger():
             else:
                 continue
 
-        logger = logging.config.dictConfig(config)
+        logging.config.dictConfig(config)
 
-    return logger
+    if queue is not True:
+        return None
+
+    from .logqueue import start_queue_logging
+
+    return start_queue_logging()
 
 
 def main():
-    set_logger()
     args = build_parser()
+    listener = set_logger(queue=args.queue_logging)
 
     args.characters = (
         [x for x in args.characters[0]] if args.characters != 0 else illegal_chars
@@ -77,11 +64,35 @@ def main():
     args_msg = f"\n\
      Aruguments used: \n\
         Characters: {args.characters}\n\
+        Categories: {args.categories}\n\
+        Reserved names: {args.reserved_names}\n\
+        Trailing dot/space: {args.trailing}\n\
+        Collisions: {args.collisions}\n\
         Destination: {args.destination}\n\
+        Platform: {args.platform}\n\
+        Destination prefix: {args.dest_prefix}\n\
+        Path limit: {args.path_limit}\n\
         Output: {args.format}\n\
-        Path: {args.path}\n\
+        Fix: {args.fix}\n\
+        Index: {args.index}\n\
+        Path: {', '.join(args.paths)}\n\
+        Manifest: {args.manifest}\n\
+        Archive: {args.archive}\n\
         Recursive: {args.recursive}\n\
+        Exclude: {args.exclude}\n\
+        Include: {args.include}\n\
+        Max depth: {args.max_depth}\n\
+        Watch: {args.watch}\n\
+        Serve: {args.serve}\n\
         Whitespace: {args.whitespace}\n\
+        Workers: {args.workers}\n\
+        Processes: {args.processes}\n\
+        Shard depth: {args.shard_depth}\n\
+        Checkpoint: {args.checkpoint}\n\
+        Resume: {args.resume}\n\
+        Stats: {args.stats}\n\
+        Queue logging: {args.queue_logging}\n\
+        Log findings: {args.log_findings}\n\
         "
 
     args.__dict__.update({"args_msg": args_msg})
@@ -97,23 +108,47 @@ def main():
     logger.info(start_msg)
     logger.info(args_msg)
 
-    exit_code = check_path(args)
-
-    if exit_code != 0:
-        logger.info("\nPath check did not complete sucessfully.\n")
-    else:
-        date_end = str(strftime("%A, %d. %B %Y %I:%M%p", localtime()))
-
-        complete_msg = f"\n\
-        ================================================================\n\
-                    Illegal Character Check - Complete\n\
-                        {date_end}\n\
-        ================================================================\n\
-        "
-        logger.info(complete_msg)
+    try:
+        if args.undo is not None:
+            from .remediate import undo_renames
+
+            exit_code = undo_renames(args)
+        elif args.fix is True:
+            from .remediate import remediate_path
+
+            exit_code = remediate_path(args)
+        elif args.watch is True:
+            from .watch import watch_path
+
+            exit_code = watch_path(args)
+        elif args.serve is not None:
+            from .daemon import serve
+
+            exit_code = serve(args)
+        else:
+            from .check_path import check_path
+
+            exit_code = check_path(args)
+
+        if exit_code != 0:
+            logger.info("\nPath check did not complete sucessfully.\n")
+        else:
+            date_end = str(strftime("%A, %d. %B %Y %I:%M%p", localtime()))
+
+            complete_msg = f"\n\
+            ================================================================\n\
+                        Illegal Character Check - Complete\n\
+                            {date_end}\n\
+            ================================================================\n\
+            "
+            logger.info(complete_msg)
+
+    finally:
+        # flush anything still queued for the log handlers
+        if listener is not None:
+            listener.stop()
     return
 
 
 if __name__ == "__main__":
-    set_logger()
     main()
@@ -0,0 +1,76 @@
+import sys
+import tarfile
+import zipfile
+
+from .manifest import check_manifest_entries, manifest_entries
+
+
+def member_path(name, is_dir):
+    """
+    The path of an archive member as the manifest entries take it, with
+    directories ending in a separator and any leading ./ dropped.
+    """
+    while name.startswith("./"):
+        name = name[2:]
+    name = name.rstrip("/")
+    if is_dir and name:
+        name += "/"
+    return name
+
+
+def zip_members(filename):
+    """
+    Yield the member paths of a zip file, read from its central directory
+    alone, so none of the data is read.
+    """
+    with zipfile.ZipFile(filename) as archive:
+        for info in archive.infolist():
+            path = member_path(info.filename, info.is_dir())
+            if path:
+                yield path
+
+
+def tar_members(filename):
+    """
+    Yield the member paths of a tar file, compressed or not, from its
+    headers. A tar file on disk is seeked through from header to header;
+    from stdin ("-") it is streamed and the data read past. The members
+    are dropped as they are read, so a large archive is listed in constant
+    memory.
+    """
+    if filename == "-":
+        archive = tarfile.open(fileobj=sys.stdin.buffer, mode="r|*")
+    else:
+        archive = tarfile.open(filename, mode="r:*")
+
+    with archive:
+        while True:
+            member = archive.next()
+            if member is None:
+                break
+            # TarFile keeps every member it has read otherwise
+            archive.members.clear()
+
+            path = member_path(member.name, member.isdir())
+            if path:
+                yield path
+
+
+def archive_members(filename):
+    """
+    The member paths of a zip or tar file.
+    """
+    if filename != "-" and zipfile.is_zipfile(filename):
+        return zip_members(filename)
+    return tar_members(filename)
+
+
+def archive_check(args, path_total, illegal_total):
+    """
+    Check the member paths of the --archive without extracting it.
+    Paths are checked as they would be extracted, relative to where the
+    archive is unpacked: every directory in a member path has its name
+    checked, and files their name, whitespace and path length.
+    """
+    entries = manifest_entries(archive_members(args.archive), top="")
+    return check_manifest_entries(args, entries, path_total, illegal_total)
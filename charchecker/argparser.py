@@ -3,6 +3,10 @@ import os
 import sys
 import textwrap
 
+from .pathlength import PLATFORM_LIMITS
+from .report import REPORT_FORMATS
+from .rules import CHARACTER_CLASSES, UNICODE_CATEGORIES
+
 illegal_chars = [
     "@",
     ":",
@@ -70,7 +74,7 @@ class WrappedNewlineFormatter(DescriptionWrappedNewlineFormatter):
         return lines
 
 
-def build_parser(formatter=WrappedNewlineFormatter):
+def build_parser(formatter=WrappedNewlineFormatter, argv=None):
     program_descripton = """
     =====================================\n\
     Illegal Character Checker v1.0
@@ -102,6 +106,17 @@ def build_parser(formatter=WrappedNewlineFormatter):
         # formatter_class=argparse.RawDescriptionHelpFormatter,
         formatter_class=formatter,
     )
+    parser.add_argument(
+        "--archive",
+        default=None,
+        help=textwrap.fill(
+            "check the member paths of a zip or tar file (gz, bz2 or xz too) "
+            "without extracting it, or - for a tar stream on stdin\n"
+        ),
+        metavar="<file path>",
+        required=False,
+        type=inputpath,
+    )
     parser.add_argument(
         "-c",
         "--characters",
@@ -114,6 +129,49 @@ def build_parser(formatter=WrappedNewlineFormatter):
         required=False,
         type=check_list,
     )
+    parser.add_argument(
+        "--categories",
+        default=[],
+        nargs="*",
+        help=textwrap.fill(
+            "also treat characters in these unicode categories (e.g. Cc, Zs) or "
+            "character classes (control, format, private, separator, symbol, "
+            "surrogate, unassigned) as illegal\n"
+        ),
+        metavar="<category>",
+        required=False,
+        type=check_category,
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help=textwrap.fill(
+            "save the progress of a recursive check to this file every "
+            "--checkpoint-interval seconds, so it can be continued with --resume\n"
+        ),
+        metavar="<file path>",
+        required=False,
+        type=str,
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        default=60.0,
+        help="seconds between checkpoints with --checkpoint",
+        metavar="<seconds>",
+        required=False,
+        type=float,
+    )
+    parser.add_argument(
+        "--collisions",
+        choices=["both", "case", "unicode"],
+        default=None,
+        help=textwrap.fill(
+            "check each directory for names that collide on the destination: "
+            "that differ only in case (Windows, macOS), in unicode normalization "
+            "(e.g. NFD to NFC) or either\n"
+        ),
+        required=False,
+    )
     parser.add_argument(
         "-d",
         "--destination",
@@ -123,23 +181,169 @@ def build_parser(formatter=WrappedNewlineFormatter):
         required=False,
         type=check_destination,
     )
+    parser.add_argument(
+        "--dest-prefix",
+        default=None,
+        help=textwrap.fill(
+            "path the checked path is copied to on the destination, e.g. "
+            "\\\\server\\share\\project, path lengths are measured there. "
+            "Directory paths are checked too\n"
+        ),
+        metavar="<path>",
+        required=False,
+        type=str,
+    )
+    parser.add_argument(
+        "--exclude",
+        action="extend",
+        default=[],
+        help=textwrap.fill(
+            "skip entries matching these globs, excluded directories are never "
+            "listed. A glob with a / matches the path relative to --path, "
+            "e.g. renders/*/cache, otherwise the name, e.g. .snapshot\n"
+        ),
+        metavar="<glob>",
+        nargs="+",
+        required=False,
+    )
     parser.add_argument(
         "-f",
         "--format",
         default=".txt",
-        help="select file type for the results, defaults to a .txt file",
+        help="select file type for the results: txt, jsonl or csv, "
+        "defaults to a .txt file",
         metavar="<file type>",
         required=False,
+        type=check_format,
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        default=False,
+        help=textwrap.fill(
+            "rename every entry that breaks the rules in use to a fixed name, "
+            "recording each rename in the --journal\n"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--include",
+        action="extend",
+        default=[],
+        help="only check the files matching these globs, matched like --exclude",
+        metavar="<glob>",
+        nargs="+",
+        required=False,
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help=textwrap.fill(
+            "incremental recursive check: directories unchanged since the last "
+            "run are read from this SQLite index file instead of being listed\n"
+        ),
+        metavar="<file path>",
+        required=False,
         type=str,
     )
+    parser.add_argument(
+        "--journal",
+        default=None,
+        help=textwrap.fill(
+            "rename journal for --fix, an unfinished journal is resumed, "
+            "defaults to a dated _renames.jsonl in the destination\n"
+        ),
+        metavar="<file path>",
+        required=False,
+        type=str,
+    )
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help=textwrap.fill(
+            "check the paths listed in this file, or - for stdin, instead of "
+            "walking the tree: NUL or newline separated, optionally gzipped, "
+            "e.g. from find -print0. --path, if given, is the top of the listing. "
+            "A path is taken as a directory if it ends in a separator or the "
+            "next path is inside it, so an empty directory is checked as a "
+            "file unless --manifest-types is given\n"
+        ),
+        metavar="<file path>",
+        required=False,
+        type=inputpath,
+    )
+    parser.add_argument(
+        "--manifest-types",
+        action="store_true",
+        default=False,
+        help=textwrap.fill(
+            "each path in the --manifest follows its type and a space, as from "
+            "find -printf '%%y %%p\\0': d for a directory, anything else a file\n"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--max-depth",
+        default=None,
+        help=textwrap.fill(
+            "check no deeper than this many levels below --path in a recursive "
+            "check, 1 checks only the entries in --path itself\n"
+        ),
+        metavar="<depth>",
+        required=False,
+        type=check_count,
+    )
+    parser.add_argument(
+        "--no-log-findings",
+        action="store_false",
+        default=True,
+        dest="log_findings",
+        help="write findings to the report only, not to the log",
+        required=False,
+    )
     parser.add_argument(
         "-p",
         "--path",
-        default=None,
-        help="required value: path to check against for illegal characters",
+        action="extend",
+        default=[],
+        dest="paths",
+        help=textwrap.fill(
+            "required value: path to check against for illegal characters, "
+            "give more than one to check them all in a single run\n"
+        ),
         metavar="<file path>",
+        nargs="+",
+        required=False,
+        type=str,
+    )
+    parser.add_argument(
+        "--platform",
+        choices=sorted(PLATFORM_LIMITS),
+        default=None,
+        help=textwrap.fill(
+            "check path and name lengths against the limits of the destination "
+            "platform, counted the way it counts them (UTF-16 units on windows, "
+            "UTF-8 bytes elsewhere). Directory paths are checked too\n"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--path-limit",
+        default=None,
+        help="longest destination path allowed, instead of the --platform limit",
+        metavar="<length>",
+        required=False,
+        type=check_count,
+    )
+    parser.add_argument(
+        "--queue-logging",
+        action="store_true",
+        default=False,
+        help=textwrap.fill(
+            "log through a queue drained in batches by a background thread, so "
+            "the check never blocks on console or log file I/O\n"
+        ),
         required=False,
-        type=filesystempath,
     )
     parser.add_argument(
         "-r",
@@ -149,6 +353,95 @@ def build_parser(formatter=WrappedNewlineFormatter):
         help="perform a recursive check on all directories and files in set --path",
         required=False,
     )
+    parser.add_argument(
+        "--replacement",
+        default="_",
+        help="character illegal characters are replaced with by --fix",
+        metavar="<char>",
+        required=False,
+        type=str,
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help=textwrap.fill(
+            "continue an interrupted check from its --checkpoint, writing "
+            "the rest of the same report\n"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--reserved-names",
+        action="store_true",
+        default=False,
+        help="check for Windows reserved names (CON, PRN, AUX, NUL, COM1, LPT1...)",
+        required=False,
+    )
+    parser.add_argument(
+        "--roots",
+        default=None,
+        help="file listing more paths to check, one per line",
+        metavar="<file path>",
+        required=False,
+        type=filesystempath,
+    )
+    parser.add_argument(
+        "--serve",
+        default=None,
+        help=textwrap.fill(
+            "run as a daemon answering paths sent over this Unix socket with "
+            "the rules compiled once, see python -m charchecker.client, stop "
+            "with Ctrl-C\n"
+        ),
+        metavar="<socket path>",
+        required=False,
+        type=str,
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        default=False,
+        help=textwrap.fill(
+            "record run statistics: time per phase, entries/sec, directories "
+            "listed, syscalls, findings and report bytes, with a progress "
+            "heartbeat in the log and a stats block beside the summary\n"
+        ),
+        required=False,
+    )
+    parser.add_argument(
+        "--stats-interval",
+        default=30.0,
+        help="seconds between progress heartbeats with --stats",
+        metavar="<seconds>",
+        required=False,
+        type=float,
+    )
+    parser.add_argument(
+        "--trailing",
+        action="store_true",
+        default=False,
+        help="check for names ending in a dot or a space",
+        required=False,
+    )
+    parser.add_argument(
+        "--undo",
+        default=None,
+        help="reverse the renames recorded in a --fix journal",
+        metavar="<file path>",
+        required=False,
+        type=filesystempath,
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        default=False,
+        help=textwrap.fill(
+            "check the path once, then keep watching it (Linux inotify) and "
+            "check new or renamed entries as they arrive, stop with Ctrl-C\n"
+        ),
+        required=False,
+    )
     parser.add_argument(
         "-w",
         "--whitespace",
@@ -157,13 +450,94 @@ def build_parser(formatter=WrappedNewlineFormatter):
         help="check for illegal whitespace characters in set path",
     )
 
+    parser.add_argument(
+        "--workers",
+        default=1,
+        help="number of threads listing directories at once in a recursive check",
+        metavar="<count>",
+        required=False,
+        type=check_count,
+    )
+
+    parser.add_argument(
+        "--processes",
+        default=1,
+        help="number of worker processes checking shards of a recursive check",
+        metavar="<count>",
+        required=False,
+        type=check_count,
+    )
+    parser.add_argument(
+        "--shard-depth",
+        default=1,
+        help="directory level the tree is split into shards at with --processes",
+        metavar="<depth>",
+        required=False,
+        type=check_count,
+    )
+
+    # callable(run_stats, path_total) for programmatic use, see stats.RunStats
+    parser.set_defaults(stats_hook=None)
+
     # parser.set_defaults(func=lambda x: parser.print_usage())
-    args = parser.parse_args()
-    args = parser.parse_args(args=None if sys.argv[1:] else ["--help"])
+    if argv is None:
+        argv = sys.argv[1:] if sys.argv[1:] else ["--help"]
+    args = parser.parse_args(args=argv)
+
+    # with --manifest or --archive the paths need not exist on this machine
+    if args.manifest is None and args.archive is None:
+        for path in args.paths:
+            if not os.path.exists(path):
+                parser.error(f"--path: {path} does not exist")
+    args.paths = [os.path.join(path) for path in args.paths]
+
+    if args.roots is not None:
+        args.paths += read_roots(parser, args.roots)
+
+    # each root is checked once, in the order given
+    args.paths = list(dict.fromkeys(args.paths))
+    args.path = args.paths[0] if args.paths else None
+
+    # the index replays whole directories, it can't apply a filter to them
+    if args.index is not None and (
+        args.exclude or args.include or args.max_depth is not None
+    ):
+        parser.error("--index can't be used with --exclude, --include or --max-depth")
+
+    if len(args.paths) > 1 and args.manifest is not None:
+        parser.error("--manifest takes a single --path, the top of the listing")
+
+    if args.manifest_types and args.manifest is None:
+        parser.error("--manifest-types describes the paths of a --manifest")
+
+    if len(args.paths) > 1 and (
+        args.fix or args.watch or args.index is not None or args.checkpoint
+    ):
+        parser.error("--fix, --watch, --index and --checkpoint take a single --path")
+
+    if args.serve is not None and args.paths:
+        parser.error("--serve checks the paths sent by clients, not --path")
 
     return args
 
 
+def read_roots(parser, filename):
+    """
+    Read the paths listed in a --roots file, skipping blank lines and
+    # comments.
+    """
+    roots = []
+    with open(filename, "r") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not os.path.exists(line):
+                parser.error(f"--roots: {line} does not exist")
+            roots.append(os.path.join(line))
+    return roots
+
+
 def filesystempath(astring):
     if not os.path.exists(astring):
         raise argparse.ArgumentTypeError
@@ -171,6 +545,12 @@ def filesystempath(astring):
         return os.path.join(astring)
 
 
+def inputpath(astring):
+    if astring == "-":
+        return astring
+    return filesystempath(astring)
+
+
 def check_list(astring):
     chars = [x for x in astring]
     char_list = list(set(chars))  # remove duplicate characters
@@ -183,6 +563,31 @@ def check_list(astring):
     return astring
 
 
+def check_count(astring):
+    try:
+        count = int(astring)
+    except ValueError:
+        raise argparse.ArgumentTypeError
+    if count < 1:
+        raise argparse.ArgumentTypeError
+    else:
+        return count
+
+
+def check_category(astring):
+    if astring not in UNICODE_CATEGORIES and astring not in CHARACTER_CLASSES:
+        raise argparse.ArgumentTypeError
+    else:
+        return astring
+
+
+def check_format(astring):
+    if astring.lower() not in REPORT_FORMATS:
+        raise argparse.ArgumentTypeError
+    else:
+        return astring.lower()
+
+
 def check_destination(astring):
     dest = astring
     if os.path.exists(dest):
@@ -0,0 +1,54 @@
+from .check_path import listing_check, merge_totals, new_totals
+from .stats import timed_listings
+from .traverse import parallel_walk_roots, scandir_walk
+
+
+def serial_walk_roots(tops, path_filter=None):
+    """
+    Walk several directory trees one after the other.
+    Yields (top, root, dirs, files) like parallel_walk_roots.
+    """
+    for top in tops:
+        for root, dirs, files in scandir_walk(top, path_filter=path_filter):
+            yield top, root, dirs, files
+
+
+def batch_check(args, path_total, illegal_total):
+    """
+    Check every root given with --path or --roots in a single run, into one
+    report. The totals are kept per root as well, in args.root_totals, and
+    summed into path_total and illegal_total for the run.
+    """
+    root_totals = {top: new_totals() for top in args.paths}
+
+    # with --processes, the shards of all the roots share one process pool
+    if args.recursive is True and args.processes > 1:
+        from .shards import check_shards
+
+        root_totals = check_shards(args, root_totals)
+
+    else:
+        # with --workers, the roots share one thread pool listing directories
+        if args.workers > 1:
+            walk = parallel_walk_roots(
+                args.paths, args.workers, path_filter=args.path_filter
+            )
+        else:
+            walk = serial_walk_roots(args.paths, path_filter=args.path_filter)
+
+        if args.run_stats.enabled:
+            walk = timed_listings(walk, args.run_stats)
+
+        check_listing = listing_check(args)
+        for top, root, dirs, files in walk:
+            root_totals[top] = check_listing(
+                args, root, dirs, files, *root_totals[top]
+            )
+
+    for part_total, part_illegal in root_totals.values():
+        path_total, illegal_total = merge_totals(
+            path_total, illegal_total, part_total, part_illegal
+        )
+
+    args.root_totals = root_totals
+    return path_total, illegal_total
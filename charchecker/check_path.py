@@ -1,13 +1,35 @@
 import logging
 import os
-import re
 import sys
 from collections import Counter, OrderedDict
 from pathlib import Path
 from time import localtime, strftime
 
+from .pathfilter import compile_filter
+from .pathlength import compile_lengths
+from .report import FINDING_KINDS, REPORT_FORMATS, open_report
+from .rules import COLLISION_KEYS, compile_rules
+from .stats import run_stats, timed_listings
+from .traverse import parallel_walk, scandir_walk
+from .violations import name_collisions, name_violations, whitespace_violation
+
 logger = logging.getLogger(__name__)
 
+# the key each finding kind is written under in the report
+FINDING_KEYS = {kind: key for key, kind in FINDING_KINDS.items()}
+
+# how each kind of finding is introduced in the log
+FINDING_MESSAGES = {
+    "illegal_chars": "Illegal Characters",
+    "whitespace": "Illegal whitespace",
+    "path_length": "Too many characters for the destination path",
+    "name_length": "Too many characters for the destination name",
+    "name_collision": "Name collides on the destination",
+    "undecodable_name": "Name is not valid UTF-8",
+    "reserved_name": "Reserved name",
+    "trailing_char": "Trailing character",
+}
+
 
 def check_path(args):
     """
@@ -24,68 +46,101 @@ def check_path(args):
     # write_to_file(start_msg=start_msg)
     # write_to_file(args_msg=args.args_msg)
 
-    path_total = {
-        "char_limit_count": 0,
-        "dir_count": 0,
-        "ds_count": 0,
-        "file_count": 0,
-        "illegal_char_list": [],
-        "illegal_dirname_total": 0,
-        "illegal_filename_total": 0,
-    }
+    path_total, illegal_total = new_totals()
 
-    illegal_total = Counter({"illegalchar_count": 0, "whitespace_count": 0})
+    # compile the character rules and path filter once for the whole run
+    args.rules = compile_rules(args)
+    args.path_filter = compile_filter(args)
+    args.path_lengths = compile_lengths(args)
+    args.collision_key = COLLISION_KEYS.get(args.collisions)
+    args.report_sink = None
+    args.run_stats = run_stats(args)
 
-    # Note: have to treat recurive and non-recursive seperately because the
-    # recursive method uses topdown=false, it will not work for only top-level scan.
+    # Note: a non-recursive check is the same walk with a max depth of 1,
+    # but it checks every entry in the listing, including hidden files.
 
     try:
-        if args.recursive is not True:
-            for item in os.listdir(Path(args.path)):
-                path = Path(args.path, item)
-                path_total = update_count(path, path_total)
-                path_total = path_len_check(args, path, path_total)
+        # with --checkpoint, a serial recursive check saves its progress
+        # every --checkpoint-interval seconds, --resume carries on from it.
+        checkpoint, resume_state = open_checkpoint(args)
 
-                path_total, illegal_total = illegalchar_check(
-                    args, path, path_total, illegal_total
-                )
+        # one buffered report file is kept open for the whole run
+        if resume_state is not None:
+            report_file = resume_state["report_file"]
+        else:
+            report_file = report_filename(args)
+        args.report_sink = open_report(report_file, args.format)
 
-                if args.whitespace is not False:
-                    illegal_total = whitespace_check(args, path, illegal_total)
-                else:
-                    pass
+        # with --archive, the member paths are checked without extracting it
+        if args.archive is not None:
+            from .archive import archive_check
+
+            path_total, illegal_total = archive_check(args, path_total, illegal_total)
 
-            summary = prepare_summary(args, path_total, illegal_total)
-            write_to_file(destination=args.destination, summary=summary)
-            return exitcode
+        # with --manifest, the listed paths are checked without a walk
+        elif args.manifest is not None:
+            from .manifest import manifest_check
+
+            path_total, illegal_total = manifest_check(
+                args, path_total, illegal_total
+            )
+
+        # with more than one root, they are all checked in a single run
+        elif len(args.paths) > 1:
+            from .batch import batch_check
+
+            path_total, illegal_total = batch_check(args, path_total, illegal_total)
+
+        # with --index, only directories changed since the last run are
+        # listed, the rest are read back from the index.
+        elif args.recursive is True and args.index is not None:
+            from .index import incremental_check
+
+            path_total, illegal_total = incremental_check(
+                args, path_total, illegal_total
+            )
+
+        # with --processes, the tree is split into shards that are
+        # checked in worker processes and merged back in here.
+        elif args.recursive is True and args.processes > 1:
+            from .shards import sharded_check
+
+            path_total, illegal_total = sharded_check(args, path_total, illegal_total)
 
         else:
-            for root, dirs, files in os.walk(args.path, topdown=False):
-                # Check all sub-dir in set path
-                for name in dirs:
-                    path = Path(root, name)
-                    path_total = update_count(path, path_total)
-                    path_total, illegal_total = illegalchar_check(
-                        args, path, path_total, illegal_total
-                    )
-
-                # Check all files, in all sub-dir in set path
-                for name in files:
-                    if not name.startswith("."):
-                        path = Path(root, name)
-                        path_total = update_count(path, path_total)
-                        path_total = path_len_check(args, path, path_total)
-
-                        path_total, illegal_total = illegalchar_check(
-                            args, path, path_total, illegal_total
-                        )
-
-                        illegal_total = whitespace_check(args, path, illegal_total)
-                    else:
-                        continue
-
-        summary = prepare_summary(args, path_total, illegal_total)
-        write_to_file(args, summary=summary)
+            # the directories still to list, kept for the checkpoints
+            frontier = [args.path]
+            if resume_state is not None:
+                frontier, path_total, illegal_total = checkpoint.restore(
+                    args, resume_state
+                )
+
+            # with --workers, directories are listed concurrently from a
+            # thread pool; the checks still run here, one listing at a time.
+            if args.workers > 1:
+                walk = parallel_walk(
+                    args.path, args.workers, path_filter=args.path_filter
+                )
+            else:
+                walk = scandir_walk(
+                    args.path, frontier, path_filter=args.path_filter
+                )
+
+            if args.run_stats.enabled:
+                walk = timed_listings(walk, args.run_stats)
+
+            check_listing = listing_check(args)
+            for root, dirs, files in walk:
+                path_total, illegal_total = check_listing(
+                    args, root, dirs, files, path_total, illegal_total
+                )
+
+                if checkpoint is not None and checkpoint.due():
+                    checkpoint.save(args, frontier, path_total, illegal_total)
+
+        write_summary(args, path_total, illegal_total)
+        if checkpoint is not None:
+            checkpoint.remove()
         return exitcode
 
     except Exception as e:
@@ -100,80 +155,253 @@ def check_path(args):
         exitcode = 1
         return exitcode
 
+    finally:
+        if args.report_sink is not None:
+            args.report_sink.close()
+
+
+def open_checkpoint(args):
+    """
+    Set up the checkpoint for a check, and read it back with --resume.
+    Returns the Checkpoint and the saved state, either can be None.
+    Only a serial recursive check is checkpointed: it is the only one that
+    walks the tree, and writes its report, in the same order every time.
+    """
+    serial = (
+        args.recursive is True
+        and args.archive is None
+        and args.manifest is None
+        and len(args.paths) == 1
+        and args.index is None
+        and args.processes == 1
+        and args.workers == 1
+    )
+
+    if args.checkpoint is None:
+        if args.resume is True:
+            raise ValueError("--resume needs the --checkpoint file to resume from")
+        return None, None
+
+    if not serial:
+        if args.resume is True:
+            raise ValueError("only a serial recursive check can be resumed")
+        logger.warning(
+            "Checkpoints are only saved by a serial recursive check, "
+            "--checkpoint is ignored."
+        )
+        return None, None
+
+    from .checkpoint import Checkpoint
+
+    checkpoint = Checkpoint(args.checkpoint, args.checkpoint_interval)
+    if args.resume is True:
+        return checkpoint, checkpoint.load(args)
+    return checkpoint, None
+
+
+def new_totals():
+    """
+    Create the empty path_total dict and illegal_total Counter for a check.
+    """
+    path_total = {
+        "char_limit_count": 0,
+        "name_limit_count": 0,
+        "dir_count": 0,
+        "ds_count": 0,
+        "file_count": 0,
+        "illegal_char_counts": Counter(),
+        "illegal_dirname_total": 0,
+        "illegal_filename_total": 0,
+        "reserved_name_count": 0,
+        "trailing_char_count": 0,
+        "collision_count": 0,
+        "undecodable_count": 0,
+        "min_path_len": None,
+        "max_path_len": None,
+        "stat_count": 0,
+    }
+
+    illegal_total = Counter({"illegalchar_count": 0, "whitespace_count": 0})
 
-def update_count(path, path_total):
+    return path_total, illegal_total
+
+
+def merge_totals(path_total, illegal_total, part_total, part_illegal):
+    """
+    Merge the partial totals from one part of the tree into the run totals.
+    """
+    for key, value in part_total.items():
+        if key == "illegal_char_counts":
+            path_total[key].update(value)
+        elif value is None:
+            continue
+        elif key == "min_path_len":
+            path_total[key] = min(value, path_total[key] or value)
+        elif key == "max_path_len":
+            path_total[key] = max(value, path_total[key] or value)
+        else:
+            path_total[key] += value
+
+    illegal_total.update(part_illegal)
+
+    return path_total, illegal_total
+
+
+def listing_check(args):
+    """
+    The function checking each listing: check_entries for a recursive check,
+    check_top_entries for a non-recursive one.
+    """
+    if args.recursive is True:
+        return check_entries
+    return check_top_entries
+
+
+def check_top_entries(args, root, dirs, files, path_total, illegal_total):
+    """
+    Run the checks on every entry in the top-level listing of a
+    non-recursive check, hidden files included.
+    """
+    args.run_stats.add("dirs_listed")
+
+    with args.run_stats.phase("matching"):
+        if args.collision_key is not None:
+            path_total = collision_check(args, dirs + files, path_total)
+
+        for entry in dirs + files:
+            path_total = update_count(entry, path_total)
+            path_total = path_len_check(args, entry, path_total)
+
+            path_total, illegal_total = illegalchar_check(
+                args, entry, path_total, illegal_total
+            )
+
+            if args.whitespace is not False:
+                illegal_total = whitespace_check(args, entry, illegal_total)
+            else:
+                pass
+
+    args.run_stats.tick(path_total)
+
+    return path_total, illegal_total
+
+
+def check_entries(args, root, dirs, files, path_total, illegal_total):
+    """
+    Run the checks on the sub-dirs and files from a single directory listing.
+    dirs and files hold the os.DirEntry of each entry, so the checks work on
+    plain strings and the type from the listing without any stat calls.
+    """
+    args.run_stats.add("dirs_listed")
+
+    with args.run_stats.phase("matching"):
+        # Check the whole listing, hidden files too, for names that collide
+        if args.collision_key is not None:
+            path_total = collision_check(args, dirs + files, path_total)
+
+        # Check all sub-dir in the listing
+        for entry in dirs:
+            path_total = update_count(entry, path_total)
+            if args.path_lengths.check_dirs is True:
+                path_total = path_len_check(args, entry, path_total)
+
+            path_total, illegal_total = illegalchar_check(
+                args, entry, path_total, illegal_total
+            )
+
+        # Check all files in the listing
+        for entry in files:
+            if not entry.name.startswith("."):
+                path_total = update_count(entry, path_total)
+                path_total = path_len_check(args, entry, path_total)
+
+                path_total, illegal_total = illegalchar_check(
+                    args, entry, path_total, illegal_total
+                )
+
+                illegal_total = whitespace_check(args, entry, illegal_total)
+            else:
+                continue
+
+    args.run_stats.tick(path_total)
+
+    return path_total, illegal_total
+
+
+def update_count(entry, path_total):
     """
     Update the path_total count.
     Counts files, dirs, and invisible files in
     a given path.
     """
-    if path.is_dir():
+    if entry.is_dir():
         path_total["dir_count"] += 1
     else:
         path_total["file_count"] += 1
 
-    if (
-        path.name.startswith(".DS_Store")
-        or path.name.startswith("._")
-        and os.stat(path.name).st_size < 5000
-    ):
+    # symlinks needed a stat in the listing to tell if they are dirs
+    if entry.is_symlink():
+        path_total["stat_count"] += 1
+
+    if entry.name.startswith(".DS_Store"):
         path_total["ds_count"] += 1
+    elif entry.name.startswith("._"):
+        # the size of an AppleDouble file is the only thing needing a stat
+        try:
+            size = entry.stat().st_size
+            path_total["stat_count"] += 1
+            if size < 5000:
+                path_total["ds_count"] += 1
+        except OSError as e:
+            # an entry from a manifest or archive fails without a syscall,
+            # so without an errno
+            if e.errno is not None:
+                path_total["stat_count"] += 1
     else:
         pass
 
     return path_total
 
 
-def illegalchar_check(args, path, path_total, illegal_total):
+def illegalchar_check(args, entry, path_total, illegal_total):
     """
-    Check a path name against a list of illegal characters, remove any found.
+    Check a path name against the compiled character rules, record any found.
     """
-    illegalchar_count = 0
-    illegal_chars = []
+    name_check = args.rules.check(entry.name)
 
-    illegalchar_list = [x for x in args.characters]
+    # the vast majority of names are clean, nothing more to do for them.
+    if name_check is None:
+        return path_total, illegal_total
 
-    illegalchar_count = len([x for x in path.name if x in illegalchar_list])
+    return name_check_record(args, entry, name_check, path_total, illegal_total)
 
-    format_illchar_list = ["\\" + x + "|" for x in illegalchar_list]
-    # build the regex from the illegal character list
-    regex_var = "".join(item for item in format_illchar_list)
 
+def name_check_record(args, entry, name_check, path_total, illegal_total):
+    """
+    Record the hits the character rules found in a name, see CharRules.check
+    """
     try:
-        # regex to match on:
-        # leading and trailing all whitespace
-        # period preceding "/" or at the end of a path
-        # remove matches and count number of subs
-
-        # pattern = re.compile(
-        #     r"(\||\'|\"|\}|\{|\:|\=|\@|\*|\?|\!|\<|\>|\&|\#|\%|\$|\~|\+|\.$|^\.)"
-        # )
-
-        pattern = re.compile(rf"({regex_var[:-1]})")
-        # https://stackoverflow.com/questions/6930982/how-to-use-a-variable-inside-a-regular-expression
-
-        for match in re.findall(pattern, path.name):
-            illegalchar_count += 1 if match[0] != "" else 0
-            illegal_chars.append(match[0]) if match[0] != "" else None
-
-            if len(illegal_chars) != 0 and path.is_file():
-                path_total["illegal_filename_total"] += 1
-            elif len(illegal_chars) != 0 and path.is_dir():
-                path_total["illegal_dirname_total"] += 1
-
-            if len(illegal_chars) != 0:
-                path_total["illegal_char_list"] += illegal_chars
-                count = Counter(illegalchar_count=len(illegal_chars))
+        for violation in name_violations(entry, name_check):
+            if violation.kind == "illegal_chars":
+                if violation.is_dir:
+                    path_total["illegal_dirname_total"] += 1
+                else:
+                    path_total["illegal_filename_total"] += 1
+
+                path_total["illegal_char_counts"].update(violation.value)
+                count = Counter(illegalchar_count=len(violation.value))
                 illegal_total.update(count)
-            else:
-                continue
 
-        if len(illegal_chars) > 0:
-            illegal_values = OrderedDict(
-                {"illegal_path": path, "illegal_chars": illegal_chars}
-            )
-            write_to_file(args, illegal_values=illegal_values)
-            logger.info(f"Illegal Characters: {illegal_values}")
+            elif violation.kind == "reserved_name":
+                path_total["reserved_name_count"] += 1
+
+            elif violation.kind == "trailing_char":
+                path_total["trailing_char_count"] += 1
+
+            elif violation.kind == "undecodable_name":
+                path_total["undecodable_count"] += 1
+
+            report_violation(args, violation)
 
         return path_total, illegal_total
 
@@ -187,64 +415,101 @@ def illegalchar_check(args, path, path_total, illegal_total):
                     "
         logger.error(excp_msg)
 
+        # the totals so far are kept, the name is left out of them
+        return path_total, illegal_total
+
 
-def whitespace_check(args, path, illegal_total):
+def whitespace_check(args, entry, illegal_total):
     """
     Check for leading, trailing, or double whitespace characters in the file path.
     """
-    pattern = re.compile(r"(^\s+|\s+$|\s+/|/\s+|\s{2,})")
-    whitespace_match = re.findall(pattern, str(path))
-    whitespace_count = len(whitespace_match)
-    if whitespace_count != 0:
-        illegal_values = OrderedDict(
-            {"illegal_path": path, "whitespace_count": whitespace_count}
-        )
-        write_to_file(illegal_values=illegal_values)
-        illegal_total.update({"whitespace_count": whitespace_count})
-        logger.info(f"Illegal whitespace: {illegal_values}")
+    violation = whitespace_violation(entry)
+    if violation is not None:
+        illegal_total.update({"whitespace_count": violation.value})
+        report_violation(args, violation)
     else:
         illegal_total
 
     return illegal_total
 
 
-def path_len_check(args, path, path_total):
+def collision_check(args, entries, path_total, first=None):
     """
-    Check the length of a path and if length is over 255 characters
-    record the path and the length in the output.txt
+    Check the names of a directory's entries for any that collide on the
+    destination, with a hash index of their --collisions keys.
     """
-    if len(str(path)) > 255:
-        illegal_path = path
-        char_limit_msg = (
-            f"Too many characters for Windows path (>255): \n {illegal_path} "
-        )
-        logger.info(char_limit_msg)
+    for violation in name_collisions(entries, args.collision_key, first):
+        report_violation(args, violation)
+        path_total["collision_count"] += 1
 
-        illegal_values = OrderedDict(
-            {"illegal_path": path, "path_length": len(str(illegal_path))}
-        )
-        write_to_file(args, illegal_values=illegal_values)
-        path_total["char_limit_count"] += 1
-    else:
-        pass
+    return path_total
+
+
+def path_len_check(args, entry, path_total):
+    """
+    Check the length of a path, as it will be on the destination, and of its
+    name against the limits of the target platform, see pathlength.PathLengths
+    """
+    path_len, violations = args.path_lengths.check(entry)
+
+    if path_total["min_path_len"] is None or path_len < path_total["min_path_len"]:
+        path_total["min_path_len"] = path_len
+    if path_total["max_path_len"] is None or path_len > path_total["max_path_len"]:
+        path_total["max_path_len"] = path_len
+
+    for violation in violations:
+        report_violation(args, violation)
+        if violation.kind == "path_length":
+            path_total["char_limit_count"] += 1
+        else:
+            path_total["name_limit_count"] += 1
 
     return path_total
 
 
+def violation_values(violation):
+    """
+    The illegal_values of a violation, as write_to_file takes them.
+    """
+    return OrderedDict(
+        {
+            "illegal_path": Path(violation.path),
+            FINDING_KEYS[violation.kind]: violation.value,
+        }
+    )
+
+
+def report_violation(args, violation):
+    """
+    Write a violation to the report and log it.
+    """
+    illegal_values = violation_values(violation)
+    write_to_file(args, illegal_values=illegal_values)
+    log_finding(args, f"{FINDING_MESSAGES[violation.kind]}: {illegal_values}")
+
+
 def prepare_summary(args, path_total, illegal_total):
     """
     Prepare a summary of totals and pass it to write_to_file method.
     """
 
-    unique_char_list = set(path_total["illegal_char_list"])
+    entry_count = path_total["dir_count"] + path_total["file_count"]
+    stats_per_entry = path_total["stat_count"] / max(entry_count, 1)
 
     summary_list = []
     date_end = str(strftime("%A, %d. %B %Y %I:%M%p", localtime()))
 
+    if args.archive is not None:
+        checked = f"members of {args.archive}"
+    elif args.manifest is not None:
+        checked = f"paths listed in {args.manifest}"
+    else:
+        checked = ", ".join(args.paths)
+
     part_1 = f"\n\
     ========================== SUMMARY ================================\n\
             Check completed on: {date_end}\n\
-            Path checked = {args.path} \n\
+            Path checked = {checked} \n\
             Recursive check: {args.recursive}\n\
             WhiteSpace check: {args.whitespace}\n\
             Output file path: {args.destination}\n\
@@ -255,12 +520,48 @@ def prepare_summary(args, path_total, illegal_total):
             {path_total['dir_count']} sub-directories in path.\n\
             {path_total['file_count']} files in path.\n\
             \n\
-            {len(path_total['illegal_char_list'])} illegal characters found in total.\n\
+            {illegal_total['illegalchar_count']} illegal characters found in total.\n\
             {path_total['illegal_dirname_total']} directory names with illegal characters.\n\
             {path_total['illegal_filename_total']} filenames with illegal characters.\n\
-            {path_total['char_limit_count']} file paths that exceed the 255 Windows limit.\n\
+            {path_total['char_limit_count']} {args.path_lengths.description()}.\n\
             {path_total['ds_count']} .DS_Store files found in path.\n\
             "
+    part_2 += (
+        f"Path lengths: {path_total['min_path_len']} min, "
+        f"{path_total['max_path_len']} max.\n"
+        f"            {path_total['stat_count']} stat calls, "
+        f"{stats_per_entry:.4f} per entry.\n"
+        "            "
+    )
+    limits = args.path_lengths.limits
+    if limits.max_name is not None:
+        part_2 += (
+            f"{path_total['name_limit_count']} names that exceed the "
+            f"{limits.max_name} {limits.unit} limit of the destination.\n"
+            "            "
+        )
+    if path_total["undecodable_count"] > 0:
+        part_2 += (
+            f"{path_total['undecodable_count']} names that are not valid UTF-8.\n"
+            "            "
+        )
+    if args.collision_key is not None:
+        part_2 += (
+            f"{path_total['collision_count']} names that collide with another "
+            f"in their directory ({args.collisions}).\n"
+            "            "
+        )
+    if args.reserved_names is not False:
+        part_2 += (
+            f"{path_total['reserved_name_count']} Windows reserved names found.\n"
+            "            "
+        )
+    if args.trailing is not False:
+        part_2 += (
+            f"{path_total['trailing_char_count']} names ending in a dot or space.\n"
+            "            "
+        )
+
     summary_list.append(part_2)
 
     if args.whitespace is not False:
@@ -270,10 +571,13 @@ def prepare_summary(args, path_total, illegal_total):
         part_3 = ""
 
     part_4 = ""
-    for item in unique_char_list:
-        line = f"            {item} [{path_total['illegal_char_list'].count(item)}]\n"
+    for item, count in path_total["illegal_char_counts"].most_common():
+        line = f"            {item} [{count}]\n"
         part_4 += line
 
+    if len(args.paths) > 1:
+        part_4 += root_summary(args)
+
     part_5 = "\n================================================================================================\n\
     "
     summary_list.append(part_4)
@@ -288,31 +592,145 @@ def prepare_summary(args, path_total, illegal_total):
     return summary_list
 
 
-def write_to_file(*args, **kwargs):
+def root_summary(args):
+    """
+    Prepare the subtotals of each root in a multi-root check.
+    """
+    part = "\n            Totals per root:\n"
+    for top, (path_total, illegal_total) in args.root_totals.items():
+        part += (
+            f"\n            {top}\n"
+            f"                {path_total['dir_count']} sub-directories, "
+            f"{path_total['file_count']} files.\n"
+            f"                {illegal_total['illegalchar_count']} illegal characters, "
+            f"{path_total['illegal_dirname_total']} directory names, "
+            f"{path_total['illegal_filename_total']} filenames.\n"
+            f"                {path_total['char_limit_count']} "
+            f"{args.path_lengths.description()}.\n"
+        )
+        if args.whitespace is not False:
+            part += (
+                f"                {illegal_total['whitespace_count']} "
+                "illegal whitespace characters.\n"
+            )
+    return part
+
+
+def write_summary(args, path_total, illegal_total):
+    """
+    Write the summary, the stats block when stats are on, and the summary
+    record to the report.
+    """
+    summary = prepare_summary(args, path_total, illegal_total)
+    write_to_file(args, summary=summary)
+
+    args.run_stats.finish(path_total, args.report_sink.size())
+    if args.run_stats.enabled:
+        stats_block = args.run_stats.format_block()
+        logger.info(stats_block[0])
+        write_to_file(args, summary=stats_block)
+
+    write_to_file(
+        args, summary_record=summary_record(args, path_total, illegal_total)
+    )
+
+
+def summary_record(args, path_total, illegal_total):
+    """
+    Prepare the summary totals as a record for the machine-readable reports.
+    """
+    date_end = str(strftime("%Y-%m-%dT%H:%M:%S", localtime()))
+
+    record = {
+        "kind": "summary",
+        "completed": date_end,
+        "path": str(args.path),
+        "manifest": args.manifest,
+        "archive": args.archive,
+        "platform": args.platform,
+        "dest_prefix": args.dest_prefix,
+        "recursive": args.recursive,
+        "whitespace": args.whitespace,
+        "dir_count": path_total["dir_count"],
+        "file_count": path_total["file_count"],
+        "illegal_char_total": illegal_total["illegalchar_count"],
+        "illegal_dirname_total": path_total["illegal_dirname_total"],
+        "illegal_filename_total": path_total["illegal_filename_total"],
+        "char_limit_count": path_total["char_limit_count"],
+        "name_limit_count": path_total["name_limit_count"],
+        "ds_count": path_total["ds_count"],
+        "reserved_name_count": path_total["reserved_name_count"],
+        "trailing_char_count": path_total["trailing_char_count"],
+        "collision_count": path_total["collision_count"],
+        "undecodable_count": path_total["undecodable_count"],
+        "whitespace_count": illegal_total["whitespace_count"],
+        "min_path_len": path_total["min_path_len"],
+        "max_path_len": path_total["max_path_len"],
+        "stat_count": path_total["stat_count"],
+        "illegal_chars": dict(path_total["illegal_char_counts"]),
+    }
+
+    if len(args.paths) > 1:
+        record["roots"] = {
+            top: {
+                "dir_count": part_total["dir_count"],
+                "file_count": part_total["file_count"],
+                "illegal_char_total": part_illegal["illegalchar_count"],
+                "illegal_dirname_total": part_total["illegal_dirname_total"],
+                "illegal_filename_total": part_total["illegal_filename_total"],
+                "char_limit_count": part_total["char_limit_count"],
+                "whitespace_count": part_illegal["whitespace_count"],
+            }
+            for top, (part_total, part_illegal) in args.root_totals.items()
+        }
+
+    if args.run_stats.enabled:
+        record["stats"] = args.run_stats.snapshot()
+
+    return record
+
+
+def log_finding(args, msg):
+    """
+    Log a single finding, unless findings only go to the report.
+    """
+    if args.log_findings is not True:
+        return
+
+    with args.run_stats.phase("logging"):
+        logger.info(msg)
+
+
+def report_filename(args):
+    """
+    Path of the report file for a check started today.
+    """
     file_date = str(strftime("%Y%m%d", localtime()))
-    filename = f"{file_date}_illegal_paths.txt"
+    extension = REPORT_FORMATS[args.format]
+    return os.path.join(args.destination, f"{file_date}_illegal_paths{extension}")
 
-    for key, value in kwargs.items():
-        if key == "illegal_values":
-            value = list(value.items())
 
-        with open(filename, "a+") as f:
-            if key in ["start_msg", "args_msg"]:
-                f.write(f"{value}\n")
+def write_to_file(*args, **kwargs):
+    """
+    Write messages, findings or the summary to the open report sink.
+    """
+    report_sink = args[0].report_sink
+    stats = args[0].run_stats
 
-            if key == "illegal_values":
-                formatted_value = f"\n {value[0]} \n{value[1]} \n"
-                f.write(f"{formatted_value}\n")
+    for key, value in kwargs.items():
+        if key in ["start_msg", "args_msg"]:
+            report_sink.write(f"{value}\n")
+
+        if key == "illegal_values":
+            with stats.phase("writing"):
+                report_sink.write_finding(value)
+            stats.add("findings")
 
-            if key == "summary":
-                with open(filename, "r") as contents:
-                    save = contents.read()
-                with open(filename, "w") as contents:
-                    for line in value:
-                        contents.write(line)
-                    contents.write(save)
+        if key == "summary":
+            report_sink.write_summary(value)
 
-        f.close()
+        if key == "summary_record":
+            report_sink.write_summary_record(value)
 
     return
 
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+from .check_path import merge_totals, new_totals
+from .report import REPORT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+
+def check_settings(args):
+    """
+    The settings that decide what a check reports, a checkpoint can only be
+    resumed by a check run with the same ones.
+    """
+    return {
+        "path": str(args.path),
+        "whitespace": args.whitespace,
+        "format": REPORT_FORMATS[args.format],
+        "characters": sorted(args.characters),
+        "categories": sorted(args.categories),
+        "reserved_names": args.reserved_names,
+        "trailing": args.trailing,
+        "platform": args.platform,
+        "dest_prefix": args.dest_prefix,
+        "path_limit": args.path_limit,
+        "collisions": args.collisions,
+        "exclude": args.exclude,
+        "include": args.include,
+        "max_depth": args.max_depth,
+    }
+
+
+class Checkpoint:
+    """
+    Periodic checkpoint of a serial recursive check, saved to a JSON file.
+
+    It holds the traversal frontier (the directories still to be listed),
+    the partial totals, and the report file with its size at that point, so
+    a check that dies can carry on from it and write the same report as a
+    run that was never interrupted.
+    """
+
+    def __init__(self, filename, interval=60.0):
+        self.filename = filename
+        self.interval = interval
+        self.next_save = time.monotonic() + interval
+
+    def due(self):
+        return time.monotonic() >= self.next_save
+
+    def save(self, args, frontier, path_total, illegal_total):
+        """
+        Write the checkpoint, after the report it points into is on disk.
+        The file is replaced atomically, a crash mid-save leaves the last one.
+        """
+        state = {
+            "settings": check_settings(args),
+            "report_file": args.report_sink.filename,
+            "report_size": args.report_sink.sync(),
+            "frontier": frontier,
+            "path_total": path_total,
+            "illegal_total": illegal_total,
+            "saved": time.time(),
+        }
+
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+
+        self.next_save = time.monotonic() + self.interval
+
+    def load(self, args):
+        """
+        Read the checkpoint back for --resume.
+        """
+        with open(self.filename, "r") as f:
+            state = json.load(f)
+
+        if state["settings"] != check_settings(args):
+            raise ValueError(
+                f"checkpoint {self.filename} was saved by a check with "
+                f"different settings: {state['settings']}"
+            )
+        return state
+
+    def restore(self, args, state):
+        """
+        Cut the report back to its size at the checkpoint, anything written
+        after it is written again, and return the frontier and the totals.
+        """
+        args.report_sink.truncate(state["report_size"])
+
+        path_total, illegal_total = merge_totals(
+            *new_totals(), state["path_total"], Counter(state["illegal_total"])
+        )
+
+        logger.info(
+            f"Resuming from checkpoint {self.filename}: "
+            f"{path_total['dir_count'] + path_total['file_count']} entries "
+            f"checked, {len(state['frontier'])} directories still to list."
+        )
+        return state["frontier"], path_total, illegal_total
+
+    def remove(self):
+        """
+        The check finished, its checkpoint is no longer needed.
+        """
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,98 @@
+"""
+Client for the checker daemon started with --serve, for shell scripts:
+
+    python -m charchecker.client -s <socket> [--json] [<path>...]
+
+The paths are checked by the daemon, read from stdin one per line when none
+are given. Violations are printed one per line as kind, path and value, tab
+separated, or with --json the daemon's verdict line for every path.
+Exits 1 if any violations were found, 0 if every path is clean and 2 if the
+daemon can't be reached.
+"""
+import json
+import os
+import socket
+import sys
+import threading
+
+
+def send_paths(sock, paths):
+    """
+    Send the paths, as bytes lines, then close the sending side so the
+    daemon knows the batch is complete, even if sending fails.
+    """
+    try:
+        with sock.makefile("wb") as requests:
+            for path in paths:
+                requests.write(path.rstrip(b"\n") + b"\n")
+    except OSError:
+        pass
+    finally:
+        try:
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    socket_path = None
+    raw = False
+    paths = []
+
+    args = iter(argv)
+    for arg in args:
+        if arg in ("-h", "--help"):
+            print(__doc__)
+            return 0
+        elif arg in ("-s", "--socket"):
+            socket_path = next(args, None)
+        elif arg == "--json":
+            raw = True
+        elif arg.startswith("-"):
+            print(f"unknown option {arg}, see --help", file=sys.stderr)
+            return 2
+        else:
+            paths.append(arg)
+
+    if socket_path is None:
+        print("no daemon --socket given, see --help", file=sys.stderr)
+        return 2
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        print(f"can't reach the daemon on {socket_path}: {e}", file=sys.stderr)
+        return 2
+
+    # the paths are sent from a thread so a large batch can't fill the
+    # socket both ways while the verdicts wait to be read. Paths from stdin
+    # are sent as the raw bytes of each line.
+    sender = threading.Thread(
+        target=send_paths,
+        args=(sock, [os.fsencode(x) for x in paths] or sys.stdin.buffer),
+        daemon=True,
+    )
+    sender.start()
+
+    # paths that aren't valid UTF-8 are printed back as their own bytes
+    sys.stdout.reconfigure(errors="surrogateescape")
+
+    found = 0
+    with sock, sock.makefile("rb") as verdicts:
+        for line in verdicts:
+            verdict = json.loads(line)
+            if raw:
+                sys.stdout.write(line.decode("utf-8", "surrogateescape"))
+            for kind, value in verdict["violations"]:
+                if not raw:
+                    print(f"{kind}\t{verdict['path']}\t{value}")
+                found += 1
+
+    sender.join()
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+from collections import Counter
+
+from .pathlength import compile_lengths
+from .rules import compile_rules
+from .traverse import PathEntry
+from .violations import entry_violations
+
+logger = logging.getLogger(__name__)
+
+# bytes read from a client at once, every whole path line in them is answered
+READ_SIZE = 64 * 1024
+
+
+class Checker:
+    """
+    The compiled rules of a daemon, kept warm between requests.
+
+    Each request line is a path; the verdict is one JSON line with the
+    path and a [kind, value] pair for each violation, empty when clean.
+    Nothing is looked up on the filesystem, a path ending in a separator is
+    taken as a directory.
+    """
+
+    def __init__(self, args):
+        self.rules = compile_rules(args)
+        self.lengths = compile_lengths(args)
+        self.whitespace = args.whitespace
+        self.counts = Counter()
+
+    def verdict(self, path):
+        is_dir = path.endswith(os.sep)
+        entry = PathEntry(*os.path.split(path.rstrip(os.sep) or path), is_dir)
+
+        violations = []
+        for violation in entry_violations(
+            self.rules, entry, whitespace=self.whitespace, lengths=self.lengths
+        ):
+            value = violation.value
+            if violation.kind == "illegal_chars":
+                value = "".join(value)
+            violations.append([violation.kind, value])
+
+        self.counts["paths"] += 1
+        if violations:
+            self.counts["violations"] += len(violations)
+
+        return (json.dumps({"path": path, "violations": violations}) + "\n").encode(
+            "utf-8", "surrogateescape"
+        )
+
+
+async def handle_client(checker, reader, writer):
+    """
+    Answer every path a client sends, one verdict line per path line, until
+    it closes its end. A batch is just many lines sent at once, whatever has
+    arrived is answered in a single write.
+    """
+    checker.counts["clients"] += 1
+    pending = b""
+
+    try:
+        while True:
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                break
+
+            *lines, pending = (pending + chunk).split(b"\n")
+            verdicts = [
+                checker.verdict(os.fsdecode(line.rstrip(b"\r")))
+                for line in lines
+                if line.rstrip(b"\r")
+            ]
+            if verdicts:
+                writer.write(b"".join(verdicts))
+                await writer.drain()
+
+        # a last path without a newline
+        if pending.rstrip(b"\r"):
+            writer.write(checker.verdict(os.fsdecode(pending.rstrip(b"\r"))))
+            await writer.drain()
+
+    except ConnectionError as e:
+        logger.warning(f"Client dropped: {e}")
+
+    finally:
+        writer.close()
+
+
+def remove_stale_socket(socket_path):
+    """
+    Remove a socket file left behind by a daemon that is no longer running.
+    Raises an error if another daemon is still listening on it.
+    """
+    if not os.path.exists(socket_path):
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.remove(socket_path)
+    else:
+        raise OSError(f"a daemon is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+
+async def serve_forever(checker, socket_path):
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_client(checker, reader, writer),
+        path=socket_path,
+    )
+
+    stop = asyncio.get_running_loop().create_future()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(
+            signum, lambda: stop.done() or stop.set_result(None)
+        )
+
+    logger.info(f"Checker daemon listening on {socket_path}")
+
+    async with server:
+        await stop
+
+
+def serve(args):
+    """
+    Run the checker as a daemon on the --serve Unix socket, answering paths
+    sent by any number of clients (see charchecker.client) until stopped
+    with Ctrl-C or SIGTERM.
+    """
+    exitcode = 0
+    socket_path = args.serve
+
+    try:
+        checker = Checker(args)
+        remove_stale_socket(socket_path)
+
+        try:
+            asyncio.run(serve_forever(checker, socket_path))
+        finally:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+        logger.info(
+            f"Checker daemon stopped: {checker.counts['clients']} clients, "
+            f"{checker.counts['paths']} paths checked, "
+            f"{checker.counts['violations']} violations found."
+        )
+        return exitcode
+
+    except Exception as e:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        excp_msg = f" Exception raised: {e}\n\
+                      TYPE: {exc_type},\n\
+                      FNAME: {fname},\n\
+                      LINENO: {exc_tb.tb_lineno}\n\
+                    "
+        logger.error(excp_msg)
+        exitcode = 1
+        return exitcode
@@ -0,0 +1,249 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+from .check_path import check_entries, merge_totals, new_totals
+from .checkpoint import check_settings
+from .traverse import list_dir
+
+logger = logging.getLogger(__name__)
+
+# directories changed this recently may still be changing in the same mtime
+# tick, they are listed but not cached until a later run.
+RACY_SECONDS = 2
+
+# commit the index after this many directories
+COMMIT_EVERY = 1000
+
+# the layout of the dirs table, an index saved with another one is built again
+INDEX_VERSION = 2
+
+
+class ScanIndex:
+    """
+    On-disk SQLite index of every directory checked, keyed on its path as
+    bytes, so names that aren't valid UTF-8 are stored as they are on disk.
+    Stores the mtime/inode of the directory along with the sub-dirs to walk
+    into, the partial totals and the findings from the last time it was listed.
+
+    The cached results only hold for the settings they were found with, an
+    index saved with other settings is emptied and built again.
+    """
+
+    def __init__(self, filename, settings):
+        self.filename = filename
+        self.run_id = time.time_ns()
+        self.db = sqlite3.connect(filename)
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dirs (
+                path BLOB PRIMARY KEY,
+                mtime_ns INTEGER,
+                ctime_ns INTEGER,
+                inode INTEGER,
+                device INTEGER,
+                walk_into TEXT,
+                path_total TEXT,
+                illegal_total TEXT,
+                findings TEXT,
+                run_id INTEGER
+            )
+            """
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS settings (settings TEXT)")
+        self.changes = 0
+        self.check_settings(settings)
+
+    def check_settings(self, settings):
+        """
+        Empty the index if it was saved by a check with different settings.
+        """
+        settings = dict(settings, index_version=INDEX_VERSION)
+        settings = json.dumps(settings, sort_keys=True)
+        row = self.db.execute("SELECT settings FROM settings").fetchone()
+        if row is not None and row[0] == settings:
+            return
+
+        if row is not None:
+            logger.warning(
+                f"Index {self.filename} was saved by a check with different "
+                f"settings, it is built again: {row[0]}"
+            )
+        self.db.execute("DELETE FROM dirs")
+        self.db.execute("DELETE FROM settings")
+        self.db.execute("INSERT INTO settings VALUES (?)", (settings,))
+        self.db.commit()
+
+    def lookup(self, path, stat):
+        """
+        Return the cached results for a directory if it is unchanged since it
+        was last listed, otherwise None.
+        """
+        row = self.db.execute(
+            "SELECT mtime_ns, ctime_ns, inode, device, walk_into, path_total, "
+            "illegal_total, findings FROM dirs WHERE path = ?",
+            (os.fsencode(path),),
+        ).fetchone()
+
+        if row is None or tuple(row[:4]) != (
+            stat.st_mtime_ns,
+            stat.st_ctime_ns,
+            stat.st_ino,
+            stat.st_dev,
+        ):
+            return None
+
+        self.db.execute(
+            "UPDATE dirs SET run_id = ? WHERE path = ?",
+            (self.run_id, os.fsencode(path)),
+        )
+        self.commit_batch()
+
+        walk_into, path_total, illegal_total, findings = [
+            json.loads(x) for x in row[4:]
+        ]
+        return walk_into, path_total, Counter(illegal_total), findings
+
+    def store(self, path, stat, walk_into, path_total, illegal_total, findings):
+        """
+        Save the results of listing a directory.
+        """
+        mtime_ns = stat.st_mtime_ns
+        if time.time() - stat.st_mtime < RACY_SECONDS:
+            mtime_ns = 0
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                os.fsencode(path),
+                mtime_ns,
+                stat.st_ctime_ns,
+                stat.st_ino,
+                stat.st_dev,
+                json.dumps(walk_into),
+                json.dumps(path_total),
+                json.dumps(illegal_total),
+                json.dumps(findings),
+                self.run_id,
+            ),
+        )
+        self.commit_batch()
+
+    def prune(self, top):
+        """
+        Drop the directories under top that were not seen in this run.
+        """
+        top = os.fsencode(top)
+        prefix = os.path.join(top, b"")
+        self.db.execute(
+            "DELETE FROM dirs WHERE run_id != ? AND "
+            "(path = ? OR substr(path, 1, ?) = ?)",
+            (self.run_id, top, len(prefix), prefix),
+        )
+
+    def commit_batch(self):
+        self.changes += 1
+        if self.changes >= COMMIT_EVERY:
+            self.db.commit()
+            self.changes = 0
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+class RecordingSink:
+    """
+    Passes findings on to the report sink while keeping a copy of the
+    findings for a single directory, so they can be saved to the index.
+    """
+
+    def __init__(self, report_sink):
+        self.report_sink = report_sink
+        self.findings = []
+
+    def write_finding(self, illegal_values):
+        (_, path), (key, value) = illegal_values.items()
+        self.findings.append([str(path), key, value])
+        self.report_sink.write_finding(illegal_values)
+
+
+def incremental_check(args, path_total, illegal_total):
+    """
+    Check the tree, only listing the directories that changed since the last
+    run recorded in the --index file. Unchanged directories have their
+    findings and totals replayed from the index, so the report is complete.
+    """
+    # one index can hold several trees, the path is left out of the settings
+    settings = check_settings(args)
+    del settings["path"]
+    index = ScanIndex(args.index, settings)
+    index_args = argparse.Namespace(**vars(args))
+    listed = 0
+    cached = 0
+
+    try:
+        stack = [args.path]
+
+        while stack:
+            root = stack.pop()
+            args.run_stats.add("dir_stats")
+            try:
+                stat = os.stat(root)
+            except OSError:
+                continue
+
+            result = index.lookup(root, stat)
+
+            if result is not None:
+                walk_into, part_total, part_illegal, findings = result
+                with args.run_stats.phase("writing"):
+                    for path, key, value in findings:
+                        illegal_values = OrderedDict(
+                            {"illegal_path": Path(path), key: value}
+                        )
+                        args.report_sink.write_finding(illegal_values)
+                args.run_stats.add("findings", len(findings))
+                args.run_stats.add("dirs_cached")
+                cached += 1
+
+            else:
+                with args.run_stats.phase("listing"):
+                    root, dirs, files, walk_into = list_dir(root)
+                part_total, part_illegal = new_totals()
+                index_args.report_sink = RecordingSink(args.report_sink)
+
+                part_total, part_illegal = check_entries(
+                    index_args, root, dirs, files, part_total, part_illegal
+                )
+                index.store(
+                    root,
+                    stat,
+                    walk_into,
+                    part_total,
+                    part_illegal,
+                    index_args.report_sink.findings,
+                )
+                listed += 1
+
+            path_total, illegal_total = merge_totals(
+                path_total, illegal_total, part_total, part_illegal
+            )
+            stack.extend(os.path.join(root, name) for name in reversed(walk_into))
+
+        index.prune(args.path)
+
+    finally:
+        index.close()
+
+    logger.info(
+        f"Incremental check: {listed} directories listed, "
+        f"{cached} unchanged directories read from {args.index}"
+    )
+
+    return path_total, illegal_total
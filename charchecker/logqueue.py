@@ -0,0 +1,133 @@
+import logging
+import multiprocessing
+import queue
+from contextlib import contextmanager
+from logging.handlers import BaseRotatingHandler, QueueHandler, QueueListener
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    A QueueListener that drains the queue in batches, so each handler does
+    one write and one flush per batch of records instead of one per record.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size=500):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        while True:
+            record = self.dequeue(True)
+            batch = []
+
+            while record is not self._sentinel:
+                batch.append(self.prepare(record))
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self.handle_batch(batch)
+
+            if record is self._sentinel:
+                return
+
+    def handle_batch(self, records):
+        for handler in self.handlers:
+            batch = [
+                record
+                for record in records
+                if record.levelno >= handler.level and handler.filter(record)
+            ]
+            if not batch:
+                continue
+
+            # anything that isn't a plain stream/file handler gets the
+            # records one at a time as usual.
+            if not isinstance(handler, logging.StreamHandler):
+                for record in batch:
+                    handler.handle(record)
+                continue
+
+            text = "".join(
+                handler.format(record) + handler.terminator for record in batch
+            )
+
+            handler.acquire()
+            try:
+                if isinstance(handler, BaseRotatingHandler):
+                    if handler.shouldRollover(batch[0]):
+                        handler.doRollover()
+                if isinstance(handler, logging.FileHandler) and handler.stream is None:
+                    handler.stream = handler._open()
+                handler.stream.write(text)
+                handler.flush()
+            except Exception:
+                handler.handleError(batch[0])
+            finally:
+                handler.release()
+
+
+def start_queue_logging(logger=None):
+    """
+    Move the handlers of a logger (the root logger by default) behind a
+    QueueHandler, so logging calls only put the record on a queue and the
+    console and file I/O happens on a listener thread.
+    Returns the started listener, stop() it to flush and finish.
+    """
+    logger = logger or logging.getLogger()
+    handlers = list(logger.handlers)
+    log_queue = queue.SimpleQueue()
+
+    for handler in handlers:
+        logger.removeHandler(handler)
+    queue_handler = QueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+
+    listener = BatchingQueueListener(log_queue, *handlers)
+    listener.start()
+
+    # kept for the worker processes, see worker_logging
+    queue_handler.listener = listener
+    return listener
+
+
+def queue_worker(log_queue, logger):
+    """
+    Initializer of a worker process: its records go to the parent's
+    handlers through log_queue, instead of the queue handler it inherited,
+    whose listener thread wasn't copied into the process.
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+
+
+@contextmanager
+def worker_logging(logger=None):
+    """
+    The initializer and its arguments for a process pool, so the records
+    logged in the workers are handled here. With queue logging they are sent
+    back through a multiprocessing queue and drained by a listener while the
+    pool runs; otherwise the workers keep the handlers they inherit, and the
+    initializer is None.
+    """
+    logger = logger or logging.getLogger()
+    listener = None
+    for handler in logger.handlers:
+        listener = getattr(handler, "listener", listener)
+
+    if listener is None:
+        yield None, ()
+        return
+
+    log_queue = multiprocessing.Queue()
+    worker_listener = BatchingQueueListener(log_queue, *listener.handlers)
+    worker_listener.start()
+    try:
+        yield queue_worker, (log_queue, logger)
+    finally:
+        worker_listener.stop()
@@ -0,0 +1,226 @@
+import gzip
+import itertools
+import os
+import sys
+
+from .check_path import (
+    collision_check,
+    name_check_record,
+    path_len_check,
+    update_count,
+    whitespace_check,
+)
+from .traverse import PathEntry
+from .vectorized import BatchRules
+
+# paths checked between progress heartbeats and stats phase switches
+BATCH_SIZE = 1000
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class ManifestEntry(PathEntry):
+    """
+    An entry read from a manifest. It may not exist on this machine at all,
+    so nothing about it is looked up on the filesystem.
+    """
+
+    __slots__ = ()
+
+    def stat(self):
+        raise OSError(f"{self.path} is from a manifest, it has no stat")
+
+
+def open_manifest(filename):
+    """
+    Open a manifest file, or stdin for "-", as a binary stream. Gzipped
+    manifests are recognised from their first bytes and read as they are
+    decompressed.
+    """
+    if filename == "-":
+        stream = sys.stdin.buffer
+        if stream.peek(2)[:2] == GZIP_MAGIC:
+            stream = gzip.GzipFile(fileobj=stream, mode="rb")
+        return stream
+
+    stream = open(filename, "rb")
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        stream.close()
+        stream = gzip.open(filename, "rb")
+    return stream
+
+
+def manifest_paths(stream):
+    """
+    Yield each path in a manifest. The paths are NUL separated, as from
+    find -print0, if there is a NUL near the start, otherwise one per line.
+    """
+    if b"\0" in stream.peek(64 * 1024):
+        rest = b""
+        while True:
+            chunk = stream.read(1024 * 1024)
+            if not chunk:
+                break
+            records = (rest + chunk).split(b"\0")
+            rest = records.pop()
+            for record in records:
+                if record:
+                    yield os.fsdecode(record)
+        if rest:
+            yield os.fsdecode(rest)
+    else:
+        for line in stream:
+            line = line.rstrip(b"\r\n")
+            if line:
+                yield os.fsdecode(line)
+
+
+def typed_paths(paths):
+    """
+    Yield the paths of a --manifest-types listing, each given after its
+    type and a space as from find -printf '%y %p\\0'. Directories are
+    yielded ending in a separator, so an empty one isn't taken as a file.
+    """
+    for record in paths:
+        kind, _, path = record.partition(" ")
+        if kind == "d" and not path.endswith(os.sep):
+            path += os.sep
+        if path:
+            yield path
+
+
+def missing_parents(path, tops, seen_dirs):
+    """
+    The directories above path, below the tops, that the manifest hasn't
+    had yet, outermost first. They are added to seen_dirs.
+    """
+    parents = []
+    parent = os.path.dirname(path)
+
+    while parent and parent not in tops and parent not in seen_dirs:
+        # the filesystem root has no name to check
+        if os.path.dirname(parent) == parent:
+            break
+        seen_dirs.add(parent)
+        parents.append(parent)
+        parent = os.path.dirname(parent)
+
+    return reversed(parents)
+
+
+def manifest_entries(paths, top=None):
+    """
+    Turn the paths in a manifest into entries for the checks.
+
+    A path is a directory if it ends with a separator, or if the path after
+    it is inside it, as in the top-down listing from find. Directories that
+    are never listed themselves, as in an object store inventory, are made
+    up from the paths inside them, so their names are checked too.
+    Like the root of a walk, the top of the listing (--path) and . aren't
+    checked themselves; every other path is.
+    """
+    tops = {os.curdir}
+    if top is not None:
+        tops.add(top.rstrip(os.sep) or top)
+
+    seen_dirs = set()
+    paths = iter(paths)
+    current = next(paths, None)
+    following = next(paths, None)
+
+    while current is not None:
+        path = current.rstrip(os.sep) or current
+        is_dir = current.endswith(os.sep) or (
+            following is not None and following.startswith(path + os.sep)
+        )
+
+        if path not in tops:
+            for parent in missing_parents(path, tops, seen_dirs):
+                yield ManifestEntry(*os.path.split(parent), True)
+
+            root, name = os.path.split(path)
+            if not is_dir:
+                yield ManifestEntry(root, name, False)
+            elif path not in seen_dirs:
+                seen_dirs.add(path)
+                yield ManifestEntry(root, name, True)
+
+        current, following = following, next(paths, None)
+
+
+def manifest_check(args, path_total, illegal_total):
+    """
+    Check the paths listed in the --manifest instead of walking the tree.
+    The same checks as a recursive check are run on each entry, directory
+    names for directories, and path length, names and whitespace for files,
+    without touching the filesystem.
+    """
+    stream = open_manifest(args.manifest)
+
+    try:
+        paths = manifest_paths(stream)
+        if args.manifest_types:
+            paths = typed_paths(paths)
+
+        entries = manifest_entries(paths, top=args.path)
+        path_total, illegal_total = check_manifest_entries(
+            args, entries, path_total, illegal_total
+        )
+
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+    return path_total, illegal_total
+
+
+def check_manifest_entries(args, entries, path_total, illegal_total):
+    """
+    Run the checks on entries that come from a listing, not a walk, in
+    batches of BATCH_SIZE. The names of each batch are run through the
+    character rules at once, see vectorized.BatchRules
+    """
+    batch_rules = BatchRules(args.rules)
+
+    # the listing is in no particular order, so names are checked for
+    # collisions against every name seen in their directory so far.
+    collision_index = {}
+
+    while True:
+        with args.run_stats.phase("listing"):
+            batch = list(itertools.islice(entries, BATCH_SIZE))
+        if not batch:
+            break
+
+        with args.run_stats.phase("matching"):
+            if args.collision_key is not None:
+                path_total = collision_check(
+                    args, batch, path_total, first=collision_index
+                )
+
+            name_checks = batch_rules.check_names([entry.name for entry in batch])
+
+            for entry, name_check in zip(batch, name_checks):
+                if entry.is_dir():
+                    path_total = update_count(entry, path_total)
+                    if args.path_lengths.check_dirs is True:
+                        path_total = path_len_check(args, entry, path_total)
+
+                    if name_check is not None:
+                        path_total, illegal_total = name_check_record(
+                            args, entry, name_check, path_total, illegal_total
+                        )
+                elif not entry.name.startswith("."):
+                    path_total = update_count(entry, path_total)
+                    path_total = path_len_check(args, entry, path_total)
+
+                    if name_check is not None:
+                        path_total, illegal_total = name_check_record(
+                            args, entry, name_check, path_total, illegal_total
+                        )
+
+                    illegal_total = whitespace_check(args, entry, illegal_total)
+
+        args.run_stats.tick(path_total)
+
+    return path_total, illegal_total
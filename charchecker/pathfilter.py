@@ -0,0 +1,98 @@
+import fnmatch
+import os
+import re
+
+
+def compile_globs(globs):
+    """
+    Compile a list of globs into a single regex, or None for no globs.
+    """
+    if not globs:
+        return None
+    return re.compile("|".join(fnmatch.translate(x) for x in globs))
+
+
+class PathFilter:
+    """
+    The --exclude and --include globs and the --max-depth of a run, applied
+    to each listing before anything in it is checked or walked into.
+
+    A glob with no separator matches entry names, e.g. .snapshot or *.tmp,
+    one with a separator matches the path relative to the root, e.g.
+    renders/*/cache. Each kind is compiled into one regex, so an entry costs
+    a single match however many globs there are.
+    """
+
+    def __init__(self, exclude=(), include=(), max_depth=None):
+        self.exclude_names = compile_globs([x for x in exclude if os.sep not in x])
+        self.exclude_paths = compile_globs([x for x in exclude if os.sep in x])
+        self.include_names = compile_globs([x for x in include if os.sep not in x])
+        self.include_paths = compile_globs([x for x in include if os.sep in x])
+        self.include = bool(include)
+        self.max_depth = max_depth
+
+    def excluded(self, prefix, name):
+        """
+        Check an entry against the --exclude globs, prefix is the relative
+        path of the directory it is in.
+        """
+        if self.exclude_names is not None and self.exclude_names.match(name):
+            return True
+        if self.exclude_paths is not None:
+            return self.exclude_paths.match(prefix + name) is not None
+        return False
+
+    def included(self, prefix, name):
+        """
+        Check a file against the --include globs, everything is included
+        when there are none.
+        """
+        if not self.include:
+            return True
+        if self.include_names is not None and self.include_names.match(name):
+            return True
+        if self.include_paths is not None:
+            return self.include_paths.match(prefix + name) is not None
+        return False
+
+    def prune(self, top, root, dirs, files, walk_into):
+        """
+        Filter the listing of root, in the tree walked from top.
+        Excluded sub-dirs are dropped from the listing and never walked into,
+        --include keeps only the files it matches, and no sub-dirs are
+        walked into past --max-depth.
+        """
+        relative = root[len(top) :].strip(os.sep)
+        prefix = relative + os.sep if relative else ""
+        depth = prefix.count(os.sep)
+
+        if self.exclude_names is not None or self.exclude_paths is not None:
+            dirs = [x for x in dirs if not self.excluded(prefix, x.name)]
+            files = [x for x in files if not self.excluded(prefix, x.name)]
+            kept = set(x.name for x in dirs)
+            walk_into = [x for x in walk_into if x in kept]
+
+        if self.include:
+            files = [x for x in files if self.included(prefix, x.name)]
+
+        # the entries in root are one level below it
+        if self.max_depth is not None and depth + 1 >= self.max_depth:
+            walk_into = []
+
+        return dirs, files, walk_into
+
+
+def compile_filter(args):
+    """
+    Compile the path filter for a run from the parsed arguments, or None
+    when every entry is checked. A non-recursive check is a walk with a
+    max depth of 1.
+    """
+    max_depth = args.max_depth
+    if args.recursive is not True:
+        max_depth = 1
+
+    if not args.exclude and not args.include and max_depth is None:
+        return None
+
+    return PathFilter(args.exclude, args.include, max_depth)
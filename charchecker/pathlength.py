@@ -0,0 +1,177 @@
+import os
+from collections import namedtuple
+
+from .violations import MAX_PATH_LEN, Violation
+
+# How a platform counts lengths and the longest path, directory path and
+# name it takes, None where there is no limit of its own.
+# unit is "chars" (Python characters), "utf-16" (code units) or "utf-8" (bytes).
+PathLimits = namedtuple("PathLimits", ["unit", "max_path", "max_dir", "max_name"])
+
+PLATFORM_LIMITS = {
+    # MAX_PATH is 260 with the terminating NUL, and a directory has to leave
+    # room for an 8.3 file name in it (MAX_PATH - 12).
+    "windows": PathLimits("utf-16", 259, 247, 255),
+    "macos": PathLimits("utf-8", 1023, None, 255),
+    "linux": PathLimits("utf-8", 4095, None, 255),
+    # an S3 object key, the destination prefix is the key prefix in the bucket
+    "s3": PathLimits("utf-8", 1024, None, None),
+}
+
+# the check as it has always been: the source path, files only
+DEFAULT_LIMITS = PathLimits("chars", MAX_PATH_LEN, None, None)
+
+# the length of a destination directory with an empty path, so its entries
+# don't count a separator, e.g. the top of an S3 bucket
+EMPTY = -1
+
+# directories measured but not listed yet, the cache is dropped past this
+CACHE_SIZE = 100000
+
+
+def utf16_units(name):
+    if name.isascii():
+        return len(name)
+    return len(name.encode("utf-16-le", "surrogatepass")) // 2
+
+
+def utf8_units(name):
+    if name.isascii():
+        return len(name)
+    try:
+        return len(name.encode("utf-8", "surrogateescape"))
+    except UnicodeEncodeError:
+        return len(name.encode("utf-8", "surrogatepass"))
+
+
+UNITS = {"chars": len, "utf-16": utf16_units, "utf-8": utf8_units}
+
+
+class PathLengths:
+    """
+    Measures each entry's path as it will be on the destination and checks
+    it against the limits of the target platform.
+
+    With a destination prefix, each root being checked is mapped onto it.
+    The measured length of every directory is cached, keyed by its source
+    path, so an entry only adds the length of its own name to its parent's.
+    A directory is measured as an entry of its parent's listing before it
+    is listed itself.
+    """
+
+    def __init__(self, limits, tops=(), prefix=None, check_dirs=False):
+        self.limits = limits
+        self.units = UNITS[limits.unit]
+        self.prefix = prefix
+        self.check_dirs = check_dirs
+
+        # the roots mapped onto the prefix, longest first, "" maps the rest
+        self.tops = sorted(
+            {top.rstrip(os.sep) for top in tops} | {""}, key=len, reverse=True
+        )
+        if prefix is not None:
+            prefix = prefix.rstrip("/\\")
+            self.prefix_units = self.units(prefix) if prefix else EMPTY
+
+        self.dirs = {}
+        self.last_parent = None
+        self.last_units = None
+
+    def description(self):
+        """
+        What a path_length finding is, as the summary counts them.
+        """
+        if self.limits == DEFAULT_LIMITS and self.prefix is None:
+            return f"file paths that exceed the {MAX_PATH_LEN} Windows limit"
+        return (
+            f"paths that exceed the {self.limits.max_path} {self.limits.unit} "
+            f"limit of the destination"
+        )
+
+    def path_units(self, path):
+        """
+        Length of a source path on the destination, from scratch.
+        """
+        if self.prefix is None:
+            return self.units(path)
+
+        for top in self.tops:
+            if not top or path == top or path.startswith(top + os.sep):
+                relative = path[len(top) :].lstrip(os.sep)
+                break
+
+        if not relative:
+            return self.prefix_units
+        return self.prefix_units + 1 + self.units(relative)
+
+    def parent_units(self, parent):
+        if parent == self.last_parent:
+            return self.last_units
+
+        units = self.dirs.pop(parent, None)
+        if units is None:
+            units = self.path_units(parent)
+
+        self.last_parent, self.last_units = parent, units
+        return units
+
+    def check(self, entry):
+        """
+        Measure an entry's path on the destination.
+        Returns the length and a list of the violations, if any.
+        """
+        path = entry.path
+        name_units = self.units(entry.name)
+
+        if self.prefix is None and path.isascii():
+            units = len(path)
+        else:
+            cut = len(path) - len(entry.name) - 1
+            if cut < 0:
+                units = self.path_units(path)
+            else:
+                units = self.parent_units(path[:cut]) + 1 + name_units
+
+        is_dir = entry.is_dir()
+        if is_dir:
+            if len(self.dirs) >= CACHE_SIZE:
+                self.dirs.clear()
+            self.dirs[path] = units
+
+        violations = []
+        limit = self.limits.max_path
+        if is_dir and self.limits.max_dir is not None:
+            limit = self.limits.max_dir
+
+        if units > limit:
+            violations.append(Violation(path, "path_length", units, is_dir))
+
+        max_name = self.limits.max_name
+        if max_name is not None and name_units > max_name:
+            violations.append(Violation(path, "name_length", name_units, is_dir))
+
+        return units, violations
+
+
+def compile_lengths(args):
+    """
+    Set up the path length check for a run from the parsed arguments.
+    With neither --platform nor --dest-prefix, the source path of each file
+    is checked against the 255 character limit, as it always has been.
+    """
+    limits = DEFAULT_LIMITS
+    if args.platform is not None:
+        limits = PLATFORM_LIMITS[args.platform]
+    if args.path_limit is not None:
+        limits = limits._replace(max_path=args.path_limit, max_dir=None)
+
+    tops = list(args.paths)
+    if args.archive is not None:
+        tops = []
+
+    return PathLengths(
+        limits,
+        tops,
+        prefix=args.dest_prefix,
+        check_dirs=args.platform is not None or args.dest_prefix is not None,
+    )
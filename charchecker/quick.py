@@ -0,0 +1,72 @@
+"""
+Minimal entry point for checking a few paths, e.g. once per uploaded file:
+
+    python -m charchecker.quick [-w] [--reserved-names] [--trailing] <path>...
+
+Each path is checked for illegal characters in its name, its length and,
+with -w, its whitespace, using the default characters. Nothing is looked up
+on the filesystem; a path ending in a separator is taken as a directory.
+Violations are printed one per line as kind, path and value, tab separated.
+Exits 1 if any were found, 0 if every path is clean, 2 on a usage error.
+
+There is no yaml, logging setup, argparse or report file here, so it
+starts as fast as the interpreter allows.
+"""
+import os
+import sys
+
+from .rules import DEFAULT_CHARACTERS, CharRules
+from .traverse import PathEntry
+from .violations import entry_violations
+
+FLAGS = ("-w", "--whitespace", "--reserved-names", "--trailing")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    flags = set()
+    paths = []
+
+    for arg in argv:
+        if arg in ("-h", "--help"):
+            print(__doc__)
+            return 0
+        elif arg in FLAGS:
+            flags.add(arg)
+        elif arg.startswith("-"):
+            print(f"unknown option {arg}, see --help", file=sys.stderr)
+            return 2
+        else:
+            paths.append(arg)
+
+    if not paths:
+        print("no paths to check, see --help", file=sys.stderr)
+        return 2
+
+    rules = CharRules(
+        DEFAULT_CHARACTERS,
+        reserved_names="--reserved-names" in flags,
+        trailing="--trailing" in flags,
+    )
+    whitespace = "-w" in flags or "--whitespace" in flags
+    found = 0
+
+    # paths that aren't valid UTF-8 are printed back as their own bytes
+    sys.stdout.reconfigure(errors="surrogateescape")
+
+    for path in paths:
+        is_dir = path.endswith(os.sep)
+        entry = PathEntry(*os.path.split(path.rstrip(os.sep) or path), is_dir)
+
+        for violation in entry_violations(rules, entry, whitespace=whitespace):
+            value = violation.value
+            if violation.kind == "illegal_chars":
+                value = "".join(value)
+            print(f"{violation.kind}\t{violation.path}\t{value}")
+            found += 1
+
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+import json
+import logging
+import os
+import sys
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from time import localtime, strftime
+
+from .pathfilter import compile_filter
+from .rules import compile_rules
+from .traverse import scandir_walk
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """
+    Append-only JSON lines journal of a remediation run.
+
+    The whole plan is written before anything is renamed, then every rename
+    is recorded as it is done, so a crashed run can be resumed, or a run
+    undone, from the journal alone without scanning the tree again.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.file = open(filename, "a", encoding="utf-8", errors="surrogateescape")
+
+        # a record cut short by a crash is left on a line of its own
+        if self.file.tell() > 0:
+            with open(filename, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+
+    def write(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+
+    def sync(self):
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+
+def read_journal(filename):
+    records = []
+    with open(filename, "r", encoding="utf-8", errors="surrogateescape") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # a record cut short by a crash
+                continue
+    return records
+
+
+def sanitize_name(args, name):
+    """
+    Build the fixed name for a single entry from the rules in use: illegal
+    characters replaced, whitespace collapsed, trailing dots/spaces removed
+    and reserved names suffixed.
+    """
+    rules = args.rules
+    new_name = name
+
+    if rules.illegal_chars(name):
+        new_name = "".join(
+            args.replacement if rules.is_illegal(x) else x for x in new_name
+        )
+
+    if args.whitespace is True:
+        new_name = " ".join(new_name.split())
+
+    if rules.trailing:
+        new_name = new_name.rstrip(". ")
+
+    if rules.reserved_names and rules.is_reserved(new_name):
+        stem, dot, extension = new_name.partition(".")
+        new_name = stem.rstrip(" ") + args.replacement + dot + extension
+
+    return new_name or args.replacement
+
+
+def unique_name(new_name, taken):
+    """
+    Resolve a collision with a name already in the directory by numbering
+    the new name. Names are compared case-folded, to be safe on case
+    insensitive targets.
+    """
+    if new_name.casefold() not in taken:
+        return new_name
+
+    stem, extension = os.path.splitext(new_name)
+    count = 1
+    while f"{stem}_{count}{extension}".casefold() in taken:
+        count += 1
+    return f"{stem}_{count}{extension}"
+
+
+def plan_dir(args, root, dirs, files):
+    """
+    Plan the renames for the entries of a single directory.
+    """
+    names = dirs + [x for x in files if not x.startswith(".")]
+    taken = set(x.casefold() for x in dirs + files)
+    renames = []
+
+    for name in names:
+        new_name = sanitize_name(args, name)
+        if new_name == name:
+            continue
+        new_name = unique_name(new_name, taken)
+        taken.add(new_name.casefold())
+        renames.append((name, new_name))
+
+    return renames
+
+
+def plan_renames(args, journal):
+    """
+    Walk the tree and write the rename plan to the journal.
+    Returns the plan as records grouped by directory depth.
+    """
+    top_depth = args.path.rstrip(os.sep).count(os.sep)
+    plan = []
+
+    # the walk is top-down so excluded trees are never listed, the renames
+    # are ordered deepest first by apply_renames
+    walk = scandir_walk(args.path, path_filter=compile_filter(args))
+
+    for root, dirs, files in walk:
+        depth = root.rstrip(os.sep).count(os.sep) - top_depth
+        dirs = [x.name for x in dirs]
+        files = [x.name for x in files]
+        for name, new_name in plan_dir(args, root, dirs, files):
+            record = {
+                "op": "plan",
+                "depth": depth,
+                "dir": root,
+                "src": name,
+                "dst": new_name,
+            }
+            journal.write(record)
+            plan.append(record)
+
+    journal.write({"op": "planned", "renames": len(plan)})
+    journal.sync()
+    return plan
+
+
+def rename_dir(journal, renames):
+    """
+    Apply the renames for a single directory, recording each in the journal.
+    """
+    totals = Counter()
+
+    for record in renames:
+        src = os.path.join(record["dir"], record["src"])
+        dst = os.path.join(record["dir"], record["dst"])
+        done = dict(record, op="done")
+        del done["depth"]
+
+        if not os.path.lexists(src) and os.path.lexists(dst):
+            # renamed before a crash, but not yet journaled
+            journal.write(done)
+            totals["renamed"] += 1
+            continue
+
+        try:
+            if os.path.lexists(dst):
+                raise FileExistsError(f"{dst} already exists")
+            os.rename(src, dst)
+            journal.write(done)
+            totals["renamed"] += 1
+        except OSError as e:
+            failed = dict(done, op="failed", error=str(e))
+            journal.write(failed)
+            logger.error(f"Rename failed: {src} -> {dst}: {e}")
+            totals["failed"] += 1
+
+    return totals
+
+
+def apply_renames(args, journal, plan, finished=()):
+    """
+    Apply the planned renames, deepest directories first. Directories at the
+    same depth don't affect each other's paths, so each depth is renamed in
+    parallel, one directory per task.
+    """
+    finished = set(finished)
+    levels = defaultdict(lambda: defaultdict(list))
+
+    for record in plan:
+        if (record["dir"], record["src"]) in finished:
+            continue
+        levels[record["depth"]][record["dir"]].append(record)
+
+    totals = Counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for depth in sorted(levels, reverse=True):
+            for dir_totals in pool.map(
+                lambda renames: rename_dir(journal, renames),
+                levels[depth].values(),
+            ):
+                totals.update(dir_totals)
+            journal.sync()
+
+    journal.write({"op": "complete"})
+    return totals
+
+
+def remediate_path(args):
+    """
+    Rename every entry that breaks the rules to a fixed name.
+    With an unfinished --journal, the run carries on from its plan.
+    """
+    exitcode = 0
+    args.rules = compile_rules(args)
+
+    if args.journal is None:
+        file_date = str(strftime("%Y%m%d", localtime()))
+        args.journal = os.path.join(args.destination, f"{file_date}_renames.jsonl")
+
+    try:
+        if args.rules.is_illegal(args.replacement):
+            raise ValueError(f"replacement {args.replacement!r} is itself illegal")
+
+        records = []
+        if os.path.exists(args.journal):
+            records = read_journal(args.journal)
+
+        # only the run after the last complete one can still be unfinished
+        completed = [i for i, x in enumerate(records) if x["op"] == "complete"]
+        if completed:
+            records = records[completed[-1] + 1 :]
+        ops = set(x["op"] for x in records)
+
+        journal = Journal(args.journal)
+        try:
+            if "planned" in ops and "complete" not in ops:
+                plan = [x for x in records if x["op"] == "plan"]
+                finished = [
+                    (x["dir"], x["src"])
+                    for x in records
+                    if x["op"] in ("done", "failed")
+                ]
+                logger.info(
+                    f"Resuming {len(plan) - len(finished)} of {len(plan)} "
+                    f"renames from {args.journal}"
+                )
+            else:
+                plan = plan_renames(args, journal)
+                finished = []
+                logger.info(f"{len(plan)} renames planned in {args.journal}")
+
+            totals = apply_renames(args, journal, plan, finished)
+        finally:
+            journal.close()
+
+        logger.info(
+            f"Remediation complete: {totals['renamed']} renamed, "
+            f"{totals['failed']} failed. Journal: {args.journal}"
+        )
+        exitcode = 1 if totals["failed"] else 0
+        return exitcode
+
+    except Exception as e:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        excp_msg = f" Exception raised: {e}\n\
+                      TYPE: {exc_type},\n\
+                      FNAME: {fname},\n\
+                      LINENO: {exc_tb.tb_lineno}\n\
+                    "
+        logger.error(excp_msg)
+        exitcode = 1
+        return exitcode
+
+
+def undo_renames(args):
+    """
+    Reverse every rename recorded in the --undo journal, newest first, so
+    parent directories get their old names back before their children.
+    """
+    exitcode = 0
+
+    try:
+        records = read_journal(args.undo)
+        undone = set(
+            (x["dir"], x["src"]) for x in records if x["op"] == "undone"
+        )
+        renamed = [
+            x
+            for x in records
+            if x["op"] == "done" and (x["dir"], x["src"]) not in undone
+        ]
+        totals = Counter()
+
+        journal = Journal(args.undo)
+        try:
+            for record in reversed(renamed):
+                src = os.path.join(record["dir"], record["src"])
+                dst = os.path.join(record["dir"], record["dst"])
+                try:
+                    if os.path.lexists(src):
+                        raise FileExistsError(f"{src} already exists")
+                    os.rename(dst, src)
+                    journal.write(dict(record, op="undone"))
+                    totals["undone"] += 1
+                except OSError as e:
+                    logger.error(f"Undo failed: {dst} -> {src}: {e}")
+                    totals["failed"] += 1
+        finally:
+            journal.close()
+
+        logger.info(
+            f"Undo complete: {totals['undone']} renames reversed, "
+            f"{totals['failed']} failed."
+        )
+        exitcode = 1 if totals["failed"] else 0
+        return exitcode
+
+    except Exception as e:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        excp_msg = f" Exception raised: {e}\n\
+                      TYPE: {exc_type},\n\
+                      FNAME: {fname},\n\
+                      LINENO: {exc_tb.tb_lineno}\n\
+                    "
+        logger.error(excp_msg)
+        exitcode = 1
+        return exitcode
@@ -0,0 +1,246 @@
+import csv
+import json
+import os
+import shutil
+
+from .violations import escaped_name
+
+# size of the write buffer on the open report file
+BUFFER_SIZE = 1024 * 1024
+
+# --format values and the file extension each is written with
+REPORT_FORMATS = {
+    ".txt": ".txt",
+    "txt": ".txt",
+    ".jsonl": ".jsonl",
+    "jsonl": ".jsonl",
+    ".json": ".jsonl",
+    "json": ".jsonl",
+    ".csv": ".csv",
+    "csv": ".csv",
+}
+
+# names of the finding kinds, by the key the checks record them under
+FINDING_KINDS = {
+    "illegal_chars": "illegal_chars",
+    "whitespace_count": "whitespace",
+    "path_length": "path_length",
+    "name_length": "name_length",
+    "name_collision": "name_collision",
+    "undecodable_name": "undecodable_name",
+    "reserved_name": "reserved_name",
+    "trailing_char": "trailing_char",
+}
+
+CSV_FIELDS = ["path", "kind", "characters", "length", "count"]
+
+
+def escaped_text(value):
+    """
+    A record, or any string in it, with the bytes of a name that isn't valid
+    UTF-8 as \\x escapes, so JSON and CSV readers can load it.
+    """
+    if isinstance(value, str):
+        return value if value.isascii() else escaped_name(value)
+    if isinstance(value, dict):
+        return {escaped_text(key): escaped_text(x) for key, x in value.items()}
+    if isinstance(value, list):
+        return [escaped_text(x) for x in value]
+    return value
+
+
+def finding_record(illegal_values):
+    """
+    Flatten the illegal_values of a finding into a record with the path,
+    kind, offending characters, path length and count of the finding.
+    The length of a length finding is the one measured on the destination.
+    """
+    (_, path), (key, value) = illegal_values.items()
+    path = str(path)
+    length = len(path)
+
+    if key == "illegal_chars":
+        characters, count = "".join(value), len(value)
+    elif key in ("trailing_char", "name_collision", "undecodable_name"):
+        characters, count = value, 1
+    elif key == "whitespace_count":
+        characters, count = "", value
+    elif key in ("path_length", "name_length"):
+        characters, count, length = "", 1, value
+    else:
+        characters, count = "", 1
+
+    return {
+        "path": escaped_text(path),
+        "kind": FINDING_KINDS[key],
+        "characters": escaped_text(characters),
+        "length": length,
+        "count": count,
+    }
+
+
+class ReportSink:
+    """
+    A report file held open for the whole run.
+
+    Findings are buffered and flushed to disk in batches, and the summary is
+    written as a footer, so the report is never read back or rewritten.
+    """
+
+    newline = None
+
+    # the text report writes a name that isn't valid UTF-8 back as its own
+    # bytes, the machine-readable ones escape it and never hold raw bytes.
+    errors = "surrogateescape"
+
+    def __init__(self, filename, flush_every=1000):
+        self.filename = filename
+        self.flush_every = flush_every
+        self.pending = 0
+        self.file = open(
+            filename,
+            "a+",
+            buffering=BUFFER_SIZE,
+            encoding="utf-8",
+            errors=self.errors,
+            newline=self.newline,
+        )
+        self.start_size = self.file.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, text):
+        self.file.write(text)
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def write_finding(self, illegal_values):
+        value = list(illegal_values.items())
+        self.write(f"\n {value[0]} \n{value[1]} \n\n")
+
+    def write_summary(self, summary):
+        for line in summary:
+            self.file.write(line)
+        self.flush()
+
+    def write_summary_record(self, record):
+        # the text report only carries the formatted summary
+        pass
+
+    def append_report(self, filename):
+        """
+        Copy another report, e.g. a shard's partial report, onto this one.
+        """
+        with open(filename, "r", encoding="utf-8", errors=self.errors) as part:
+            shutil.copyfileobj(part, self.file)
+
+    def size(self):
+        """
+        Bytes written to the report in this run.
+        """
+        return self.file.tell() - self.start_size
+
+    def flush(self):
+        self.file.flush()
+        self.pending = 0
+
+    def sync(self):
+        """
+        Flush the report through to disk. Returns the size of the file.
+        """
+        self.flush()
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+    def truncate(self, size):
+        """
+        Cut the report back to a size it had earlier in the run, e.g. at a
+        checkpoint, dropping anything written after it.
+        """
+        self.flush()
+        if os.fstat(self.file.fileno()).st_size < size:
+            raise ValueError(f"{self.filename} is shorter than {size} bytes")
+        self.file.truncate(size)
+        self.file.seek(0, os.SEEK_END)
+        self.start_size = size
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class JsonlReportSink(ReportSink):
+    """
+    A report with one JSON record per line for each finding, and a final
+    summary record, so results can be tailed and loaded as they are written.
+    """
+
+    errors = "backslashreplace"
+
+    def write_finding(self, illegal_values):
+        self.write(json.dumps(finding_record(illegal_values)) + "\n")
+
+    def write_summary(self, summary):
+        # the summary record carries the totals
+        pass
+
+    def write_summary_record(self, record):
+        self.file.write(json.dumps(escaped_text(record)) + "\n")
+        self.flush()
+
+
+class CsvReportSink(ReportSink):
+    """
+    A report with one CSV row per finding, the summary record is written to
+    a .summary.json file next to it.
+    """
+
+    newline = ""
+    errors = "backslashreplace"
+
+    def __init__(self, filename, flush_every=1000):
+        super().__init__(filename, flush_every=flush_every)
+        self.writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+        if self.file.tell() == 0:
+            self.writer.writeheader()
+
+    def write_finding(self, illegal_values):
+        self.writer.writerow(finding_record(illegal_values))
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def write_summary(self, summary):
+        pass
+
+    def write_summary_record(self, record):
+        self.flush()
+        with open(f"{self.filename}.summary.json", "w") as f:
+            json.dump(escaped_text(record), f, indent=4)
+
+    def append_report(self, filename):
+        with open(
+            filename, "r", encoding="utf-8", errors=self.errors, newline=""
+        ) as part:
+            part.readline()  # skip the partial report's own header
+            shutil.copyfileobj(part, self.file)
+
+
+REPORT_SINKS = {
+    ".txt": ReportSink,
+    ".jsonl": JsonlReportSink,
+    ".csv": CsvReportSink,
+}
+
+
+def open_report(filename, report_format=".txt"):
+    """
+    Open the report sink for a --format value.
+    """
+    return REPORT_SINKS[REPORT_FORMATS[report_format]](filename)
@@ -0,0 +1,189 @@
+import unicodedata
+from collections import namedtuple
+
+# Names Windows reserves for devices, with or without an extension.
+RESERVED_NAMES = frozenset(
+    ["CON", "PRN", "AUX", "NUL"]
+    + [f"COM{x}" for x in range(1, 10)]
+    + [f"LPT{x}" for x in range(1, 10)]
+)
+
+UNICODE_CATEGORIES = frozenset(
+    "Lu Ll Lt Lm Lo Mn Mc Me Nd Nl No Pc Pd Ps Pe Pi Pf Po "
+    "Sm Sc Sk So Zs Zl Zp Cc Cf Cs Co Cn L M N P S Z C".split()
+)
+
+# Named character classes, as the unicode categories they cover.
+CHARACTER_CLASSES = {
+    "control": ("Cc",),
+    "format": ("Cf",),
+    "private": ("Co",),
+    "unassigned": ("Cn",),
+    "surrogate": ("Cs",),
+    "separator": ("Zs", "Zl", "Zp"),
+    "symbol": ("S",),
+}
+
+TRAILING_CHARS = (".", " ")
+
+# The characters checked for by default.
+DEFAULT_CHARACTERS = [
+    "|",
+    "/",
+    ";",
+    ":",
+    "'",
+    '"',
+    "@",
+    ",",
+    "!",
+    "#",
+    "$",
+    "%",
+    "^",
+    "&",
+    "=",
+    "<",
+    ">",
+    "{",
+    "}",
+    "*",
+    "?",
+    "~",
+    "+",
+]
+
+NameCheck = namedtuple("NameCheck", ["chars", "reserved", "trailing", "undecodable"])
+
+
+def is_undecodable(name):
+    """
+    Check for a name that isn't valid UTF-8 on disk. The listing decodes its
+    bad bytes to surrogate escapes (PEP 383), so it still round trips to the
+    same bytes here but can't be copied to a UTF-8 or SMB destination.
+    """
+    try:
+        name.encode("utf-8")
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+class CharRules:
+    """
+    The character rules for a run, compiled once from the arguments.
+
+    Names are rejected with a single set operation when nothing can match,
+    the per character breakdown is only built for names with a hit.
+    """
+
+    def __init__(self, characters, categories=(), reserved_names=False, trailing=False):
+        self.characters = frozenset(characters)
+        self.categories = tuple(categories)
+        self.reserved_names = reserved_names
+        self.trailing = trailing
+
+        # every ascii character any rule matches, so ascii names never need
+        # a unicode category lookup.
+        ascii_chars = [chr(x) for x in range(128)]
+        self.ascii_illegal = frozenset(
+            [x for x in ascii_chars if x in self.characters or self._in_category(x)]
+        )
+        self._illegal_cache = {}
+
+    def _in_category(self, char):
+        if not self.categories:
+            return False
+        return unicodedata.category(char).startswith(self.categories)
+
+    def is_illegal(self, char):
+        """
+        Check a single character against the character and category rules.
+        """
+        if char.isascii():
+            return char in self.ascii_illegal
+        try:
+            return self._illegal_cache[char]
+        except KeyError:
+            illegal = char in self.characters or self._in_category(char)
+            self._illegal_cache[char] = illegal
+            return illegal
+
+    def illegal_chars(self, name):
+        """
+        Return the illegal characters in a name, in the order they appear.
+        """
+        if name.isascii():
+            if self.ascii_illegal.isdisjoint(name):
+                return []
+            return [x for x in name if x in self.ascii_illegal]
+        if not self.categories and self.characters.isdisjoint(name):
+            return []
+        return [x for x in name if self.is_illegal(x)]
+
+    def is_reserved(self, name):
+        """
+        Check for a Windows reserved device name, e.g. CON or com1.txt
+        """
+        stem = name.partition(".")[0].rstrip(" ")
+        return len(stem) <= 4 and stem.upper() in RESERVED_NAMES
+
+    def check(self, name):
+        """
+        Run every rule on a name in a single pass.
+        Returns None for a clean name, otherwise a NameCheck of the hits.
+        """
+        chars = self.illegal_chars(name)
+        reserved = self.reserved_names and self.is_reserved(name)
+        trailing = self.trailing and name.endswith(TRAILING_CHARS)
+        # only a non-ascii name can hold a surrogate escape
+        undecodable = not name.isascii() and is_undecodable(name)
+
+        if not chars and not reserved and not trailing and not undecodable:
+            return None
+
+        return NameCheck(chars, reserved, trailing, undecodable)
+
+
+def casefold_key(name):
+    if name.isascii():
+        return name.lower()
+    return name.casefold()
+
+
+def nfc_key(name):
+    if name.isascii():
+        return name
+    return unicodedata.normalize("NFC", name)
+
+
+def nfc_casefold_key(name):
+    if name.isascii():
+        return name.lower()
+    return unicodedata.normalize("NFC", name.casefold())
+
+
+# --collisions values and the key names are compared by on the destination:
+# case for a case-insensitive one (Windows, macOS), unicode for one that
+# normalizes names (an NFD to NFC migration), or both.
+COLLISION_KEYS = {
+    "case": casefold_key,
+    "unicode": nfc_key,
+    "both": nfc_casefold_key,
+}
+
+
+def compile_rules(args):
+    """
+    Compile the character rules for a run from the parsed arguments.
+    """
+    categories = []
+    for value in args.categories:
+        categories += CHARACTER_CLASSES.get(value, (value,))
+
+    return CharRules(
+        args.characters,
+        categories=categories,
+        reserved_names=args.reserved_names,
+        trailing=args.trailing,
+    )
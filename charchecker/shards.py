@@ -0,0 +1,135 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .check_path import check_entries, merge_totals, new_totals
+from .logqueue import worker_logging
+from .report import open_report
+from .stats import NULL_STATS, RunStats, timed_listings
+from .traverse import list_dir, parallel_walk, scandir_walk
+
+
+def split_tree(top, depth, path_filter=None):
+    """
+    List the tree down to the shard depth.
+    Returns the listings above the shard level, which are checked in the
+    parent process, and the sub-dirs at the shard level, which become shards.
+    """
+    listings = []
+    level = [top]
+
+    for _ in range(depth):
+        next_level = []
+        for root in level:
+            root, dirs, files, walk_into = list_dir(root)
+            if path_filter is not None:
+                dirs, files, walk_into = path_filter.prune(
+                    top, root, dirs, files, walk_into
+                )
+            listings.append((root, dirs, files))
+            next_level += [os.path.join(root, name) for name in walk_into]
+        level = next_level
+
+    return listings, level
+
+
+def scan_shard(args, top, shard, report_file):
+    """
+    Check everything below a single shard of the tree under top in a worker
+    process. Findings go to the shard's own partial report, and the partial
+    totals and stats counters are returned to be merged by the parent.
+    """
+    path_total, illegal_total = new_totals()
+
+    if args.workers > 1:
+        walk = parallel_walk(
+            top, args.workers, path_filter=args.path_filter, start=shard
+        )
+    else:
+        walk = scandir_walk(top, [shard], path_filter=args.path_filter)
+
+    if args.run_stats.enabled:
+        walk = timed_listings(walk, args.run_stats)
+
+    args.report_sink = open_report(report_file, args.format)
+
+    with args.report_sink:
+        for root, dirs, files in walk:
+            path_total, illegal_total = check_entries(
+                args, root, dirs, files, path_total, illegal_total
+            )
+
+    return path_total, illegal_total, args.run_stats.counters()
+
+
+def sharded_check(args, path_total, illegal_total):
+    """
+    Split the tree into shards at --shard-depth and check them in a pool of
+    --processes worker processes, merging the partial totals and reports.
+    """
+    root_totals = check_shards(args, {args.path: (path_total, illegal_total)})
+    return root_totals[args.path]
+
+
+def check_shards(args, root_totals):
+    """
+    Split every root in root_totals into shards and check the shards of all
+    of them in a single pool, so the pool stays busy however different the
+    roots are in size. Each root's partial totals are merged into its own
+    entry in root_totals.
+    """
+    report_sink = args.report_sink
+    listings = []
+    shards = []
+
+    for top in root_totals:
+        top_listings, top_shards = split_tree(
+            top, args.shard_depth, path_filter=args.path_filter
+        )
+        listings += [(top, listing) for listing in top_listings]
+        shards += [(top, shard) for shard in top_shards]
+
+    part_files = [
+        f"{report_sink.filename}.{index}.part" for index in range(len(shards))
+    ]
+
+    # the open report can't be sent to the workers, they open their own;
+    # each keeps its own stats, without heartbeats, merged in here.
+    shard_args = argparse.Namespace(**vars(args))
+    shard_args.report_sink = None
+    shard_args.run_stats = NULL_STATS
+    if args.run_stats.enabled:
+        shard_args.run_stats = RunStats(interval=float("inf"))
+    shard_args.stats_hook = None
+
+    # records logged in the workers are handled here, see worker_logging
+    with worker_logging() as (initializer, initargs), ProcessPoolExecutor(
+        max_workers=args.processes, initializer=initializer, initargs=initargs
+    ) as pool:
+        results = pool.map(
+            scan_shard,
+            [shard_args] * len(shards),
+            [top for top, _ in shards],
+            [shard for _, shard in shards],
+            part_files,
+            chunksize=1,
+        )
+
+        # the levels above the shards are checked here while the pool runs
+        for top, (root, dirs, files) in listings:
+            root_totals[top] = check_entries(
+                args, root, dirs, files, *root_totals[top]
+            )
+
+        for (top, _), part_file, (part_total, part_illegal, counters) in zip(
+            shards, part_files, results
+        ):
+            root_totals[top] = merge_totals(
+                *root_totals[top], part_total, part_illegal
+            )
+            args.run_stats.merge(counters)
+
+            report_sink.append_report(part_file)
+            os.remove(part_file)
+
+    return root_totals
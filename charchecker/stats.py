@@ -0,0 +1,249 @@
+import logging
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PHASES = ["listing", "matching", "writing", "logging"]
+
+
+class Phase:
+    """
+    Context manager timing one phase of a run. Phases nest, time spent in
+    an inner phase is not counted again in the outer one.
+    """
+
+    __slots__ = ("stats", "name", "outer")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.outer = None
+
+    def __enter__(self):
+        self.outer = self.stats.switch(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.switch(self.outer)
+
+
+class RunStats:
+    """
+    Statistics for a run: wall and CPU time per phase, counters for the
+    directories listed, syscalls, findings and report bytes, and a progress
+    heartbeat logged every `interval` seconds.
+
+    `hook`, if given, is called with the RunStats and the running path_total
+    on every heartbeat and once more when the run finishes.
+    """
+
+    enabled = True
+
+    def __init__(self, interval=30.0, hook=None):
+        self.interval = interval
+        self.hook = hook
+        self.wall = Counter()
+        self.cpu = Counter()
+        self.counts = Counter()
+        self.current = None
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.phase_wall = self.start_wall
+        self.phase_cpu = time.thread_time()
+        self.next_beat = time.monotonic() + interval
+        self.entries = 0
+
+    def phase(self, name):
+        return Phase(self, name)
+
+    def switch(self, name):
+        """
+        Charge the time so far to the current phase and start timing `name`.
+        Returns the phase that was running.
+        """
+        now_wall = time.perf_counter()
+        now_cpu = time.thread_time()
+        if self.current is not None:
+            self.wall[self.current] += now_wall - self.phase_wall
+            self.cpu[self.current] += now_cpu - self.phase_cpu
+        self.phase_wall = now_wall
+        self.phase_cpu = now_cpu
+
+        outer = self.current
+        self.current = name
+        return outer
+
+    def add(self, key, count=1):
+        self.counts[key] += count
+
+    def counters(self):
+        """
+        The counters and phase times so far, e.g. from a worker process, to
+        be merged into the stats for the run.
+        """
+        self.switch(None)
+        return self.counts, self.wall, self.cpu
+
+    def merge(self, counters):
+        """
+        Add the counters and phase times from another process to these.
+        The phase times of processes running at once add up to more than
+        the wall time of the run.
+        """
+        counts, wall, cpu = counters
+        self.counts.update(counts)
+        self.wall.update(wall)
+        self.cpu.update(cpu)
+
+    def tick(self, path_total):
+        """
+        Log a progress heartbeat if the interval has passed.
+        """
+        if time.monotonic() < self.next_beat:
+            return
+        self.next_beat = time.monotonic() + self.interval
+        self.update(path_total)
+
+        elapsed = time.perf_counter() - self.start_wall
+        logger.info(
+            f"Progress: {self.counts['dirs_listed']} directories listed, "
+            f"{self.entries} entries, {self.entries / elapsed:.0f} entries/sec, "
+            f"{self.counts['findings']} findings"
+        )
+        if self.hook is not None:
+            self.hook(self, path_total)
+
+    def update(self, path_total):
+        self.entries = path_total["dir_count"] + path_total["file_count"]
+        # dir_stats are the stat calls --index makes on each directory
+        self.counts["syscalls"] = (
+            self.counts["dirs_listed"]
+            + self.counts["dir_stats"]
+            + path_total["stat_count"]
+        )
+
+    def finish(self, path_total, report_bytes):
+        """
+        Close off the run, once the report is written.
+        """
+        self.switch(None)
+        self.update(path_total)
+        self.counts["report_bytes"] = report_bytes
+        if self.hook is not None:
+            self.hook(self, path_total)
+
+    def snapshot(self):
+        """
+        The statistics as a dict, for the machine-readable reports and hooks.
+        """
+        wall = time.perf_counter() - self.start_wall
+        return {
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(time.process_time() - self.start_cpu, 6),
+            "entries": self.entries,
+            "entries_per_sec": round(self.entries / wall) if wall else None,
+            "dirs_listed": self.counts["dirs_listed"],
+            "dirs_cached": self.counts["dirs_cached"],
+            "syscalls": self.counts["syscalls"],
+            "findings": self.counts["findings"],
+            "report_bytes": self.counts["report_bytes"],
+            "phases": {
+                name: {
+                    "wall_seconds": round(self.wall[name], 6),
+                    "cpu_seconds": round(self.cpu[name], 6),
+                }
+                for name in PHASES
+            },
+        }
+
+    def format_block(self):
+        """
+        The statistics block written beside the summary.
+        """
+        stats = self.snapshot()
+        block = (
+            "\n    ========================== STATS "
+            "==================================\n"
+            f"            {stats['wall_seconds']:.3f}s wall, "
+            f"{stats['cpu_seconds']:.3f}s CPU.\n"
+            f"            {stats['entries']} entries, "
+            f"{stats['entries_per_sec']} entries/sec.\n"
+            f"            {stats['dirs_listed']} directories listed, "
+            f"{stats['dirs_cached']} read from the index.\n"
+            f"            {stats['syscalls']} syscalls (listings and stat calls).\n"
+            f"            {stats['findings']} findings written, "
+            f"{stats['report_bytes']} bytes of report.\n"
+            "            \n"
+        )
+        for name, phase in stats["phases"].items():
+            block += (
+                f"            {name}: {phase['wall_seconds']:.3f}s wall, "
+                f"{phase['cpu_seconds']:.3f}s CPU\n"
+            )
+        block += "\n" + "=" * 96 + "\n    "
+        return [block]
+
+
+class NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class NullStats:
+    """
+    Stand-in used when stats are off, so the hot loop only pays for a
+    method call.
+    """
+
+    enabled = False
+    null_phase = NullPhase()
+
+    def phase(self, name):
+        return self.null_phase
+
+    def add(self, key, count=1):
+        pass
+
+    def counters(self):
+        return None
+
+    def merge(self, counters):
+        pass
+
+    def tick(self, path_total):
+        pass
+
+    def finish(self, path_total, report_bytes):
+        pass
+
+
+NULL_STATS = NullStats()
+
+
+def timed_listings(walk, stats):
+    """
+    Pass the listings from a walk through, charging the time spent waiting
+    on each one to the listing phase.
+    """
+    walk = iter(walk)
+    while True:
+        with stats.phase("listing"):
+            listing = next(walk, None)
+        if listing is None:
+            return
+        yield listing
+
+
+def run_stats(args):
+    """
+    The stats for a run: on with --stats or when a stats_hook is set.
+    """
+    if args.stats is True or args.stats_hook is not None:
+        return RunStats(interval=args.stats_interval, hook=args.stats_hook)
+    return NULL_STATS
@@ -0,0 +1,134 @@
+import os
+
+
+class PathEntry:
+    """
+    Stand-in for an os.DirEntry when an entry's type is already known
+    without a listing, e.g. from an inotify event.
+    """
+
+    __slots__ = ("name", "path", "_is_dir")
+
+    def __init__(self, root, name, is_dir):
+        self.name = name
+        self.path = os.path.join(root, name)
+        self._is_dir = is_dir
+
+    def is_dir(self):
+        return self._is_dir
+
+    def is_file(self):
+        return not self._is_dir
+
+    def is_symlink(self):
+        return False
+
+    def stat(self):
+        return os.stat(self.path)
+
+
+def list_dir(top):
+    """
+    List a single directory with os.scandir.
+    Returns the directory along with the os.DirEntry for its sub-dirs and
+    files, and the names of the sub-dirs that are safe to descend into
+    (symlinked dirs are listed but not followed, the same as os.walk).
+
+    The type of each entry comes from the listing itself (d_type), so no
+    stat calls are made here except to resolve symlinks.
+    """
+    dirs = []
+    files = []
+    walk_into = []
+
+    try:
+        with os.scandir(top) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    dirs.append(entry)
+                    try:
+                        is_symlink = entry.is_symlink()
+                    except OSError:
+                        is_symlink = False
+                    if not is_symlink:
+                        walk_into.append(entry.name)
+                else:
+                    files.append(entry)
+    except OSError:
+        # unreadable dirs are skipped, matching os.walk with no onerror
+        pass
+
+    return top, dirs, files, walk_into
+
+
+def scandir_walk(top, frontier=None, path_filter=None):
+    """
+    Walk a directory tree top-down with os.scandir.
+    Yields (root, dirs, files) like os.walk, but with the os.DirEntry for
+    each sub-dir and file rather than just the names.
+
+    frontier, if given, is the list of directories still to be listed and
+    the walk starts from it instead of top. It is updated in place, so after
+    each listing is handled it holds everything the walk has left to do.
+
+    path_filter, a PathFilter, prunes each listing before it is yielded or
+    walked into.
+    """
+    stack = [top] if frontier is None else frontier
+
+    while stack:
+        root, dirs, files, walk_into = list_dir(stack.pop())
+        if path_filter is not None:
+            dirs, files, walk_into = path_filter.prune(
+                top, root, dirs, files, walk_into
+            )
+        stack.extend(os.path.join(root, name) for name in reversed(walk_into))
+        yield root, dirs, files
+
+
+def parallel_walk(top, workers, path_filter=None, start=None):
+    """
+    Walk a directory tree, listing directories concurrently from a pool of
+    threads. Yields (root, dirs, files) like scandir_walk, in the order the
+    listings complete. start is where to start in the tree, top by default.
+    """
+    starts = None if start is None else [start]
+    for _, root, dirs, files in parallel_walk_roots(
+        [top], workers, path_filter=path_filter, starts=starts
+    ):
+        yield root, dirs, files
+
+
+def parallel_walk_roots(tops, workers, path_filter=None, starts=None):
+    """
+    Walk several directory trees at once from a single pool of threads, so
+    the work is shared out across all of them.
+    Yields (top, root, dirs, files), with the tree each listing belongs to.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    if starts is None:
+        starts = tops
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {
+            pool.submit(list_dir, start): top for top, start in zip(tops, starts)
+        }
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                top = pending.pop(future)
+                root, dirs, files, walk_into = future.result()
+                if path_filter is not None:
+                    dirs, files, walk_into = path_filter.prune(
+                        top, root, dirs, files, walk_into
+                    )
+                for name in walk_into:
+                    pending[pool.submit(list_dir, os.path.join(root, name))] = top
+                yield top, root, dirs, files
@@ -0,0 +1,102 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .rules import RESERVED_NAMES, TRAILING_CHARS
+
+# smaller batches are quicker to check one name at a time
+MIN_BATCH = 64
+
+
+class BatchRules:
+    """
+    Runs the character rules on a batch of names at once with NumPy.
+
+    The names are packed into one NUL separated byte buffer, and a 256 entry
+    lookup table marks every byte that may be part of an illegal character.
+    Only the names with a hit, or that may be reserved or end in a dot or a
+    space, get the exact check from CharRules, so the results are the same
+    as checking each name on its own. Without NumPy, or with an undecodable
+    name in the batch, every name gets the exact check.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.table = None
+        if numpy is None:
+            return
+
+        self.table = numpy.zeros(256, dtype=bool)
+        for char in rules.ascii_illegal:
+            self.table[ord(char)] = True
+
+        # a non-ascii byte is part of a character only the exact check knows
+        if rules.categories or not all(x.isascii() for x in rules.characters):
+            self.table[128:] = True
+
+        self.trailing = numpy.array([ord(x) for x in TRAILING_CHARS])
+
+        # the first three letters of each reserved name, as packed by pack
+        self.reserved = numpy.array(
+            sorted({self.pack(name[:3].encode()) for name in RESERVED_NAMES})
+        )
+
+    @staticmethod
+    def pack(first):
+        return (first[0] << 16) | (first[1] << 8) | first[2]
+
+    def hit_mask(self, names):
+        """
+        A bool array with a True for each name that may break a rule, the
+        rest are clean.
+        """
+        # a batch with an undecodable name fails here, and gets the exact check
+        buffer = ("\0".join(names) + "\0").encode("utf-8")
+        buffer = numpy.frombuffer(buffer, dtype=numpy.uint8)
+
+        ends = numpy.flatnonzero(buffer == 0)
+        if len(ends) != len(names):
+            raise ValueError("a name holds a NUL character")
+        starts = numpy.concatenate(([0], ends[:-1] + 1))
+
+        # each slice runs up to the next start and takes in the NUL after
+        # the name, which is never a hit.
+        mask = numpy.logical_or.reduceat(self.table[buffer], starts)
+
+        if self.rules.trailing:
+            last = buffer[numpy.maximum(ends - 1, 0)]
+            mask |= (ends > starts) & numpy.isin(last, self.trailing)
+
+        if self.rules.reserved_names:
+            # the first three bytes in upper case, read past the end of a
+            # shorter name into the buffer padding.
+            padded = numpy.concatenate((buffer, numpy.zeros(2, dtype=numpy.uint8)))
+            first = [padded[starts + x].astype(numpy.int32) for x in range(3)]
+            upper = [x & 0xDF for x in first]
+            packed = (upper[0] << 16) | (upper[1] << 8) | upper[2]
+            non_ascii = (first[0] | first[1] | first[2]) >= 128
+            mask |= numpy.isin(packed, self.reserved) | non_ascii
+
+        return mask
+
+    def check_names(self, names):
+        """
+        Run every rule on a batch of names, see CharRules.check
+        Returns a list with None for each clean name and a NameCheck for
+        each name with hits.
+        """
+        check = self.rules.check
+        if self.table is None or len(names) < MIN_BATCH:
+            return [check(name) for name in names]
+
+        try:
+            mask = self.hit_mask(names)
+        except (UnicodeEncodeError, ValueError):
+            return [check(name) for name in names]
+
+        name_checks = [None] * len(names)
+        for x in numpy.flatnonzero(mask).tolist():
+            name_checks[x] = check(names[x])
+
+        return name_checks
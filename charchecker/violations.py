@@ -0,0 +1,155 @@
+import re
+from collections import namedtuple
+
+from .rules import CharRules
+from .traverse import list_dir, scandir_walk
+
+# leading, trailing or double whitespace, and whitespace next to a separator
+WHITESPACE_PATTERN = re.compile(r"(^\s+|\s+$|\s+/|/\s+|\s{2,})")
+
+# longest path Windows takes without the extended-length prefix
+MAX_PATH_LEN = 255
+
+# A single problem found with an entry.
+# kind is one of the FINDING_KINDS and value depends on it: the illegal
+# characters, the reserved name, the trailing character, the whitespace
+# count, the path length or the escaped undecodable name.
+Violation = namedtuple("Violation", ["path", "kind", "value", "is_dir"])
+
+
+def escaped_name(name):
+    """
+    A name with the bytes that aren't valid UTF-8 as \\x escapes.
+    """
+    try:
+        raw = name.encode("utf-8", "surrogateescape")
+        return raw.decode("utf-8", "backslashreplace")
+    except UnicodeEncodeError:
+        return name.encode("utf-8", "backslashreplace").decode("utf-8")
+
+
+def name_violations(entry, name_check):
+    """
+    The violations for a name the rules found hits in, see CharRules.check
+    """
+    violations = []
+    is_dir = entry.is_dir()
+
+    if name_check.chars:
+        violations.append(
+            Violation(entry.path, "illegal_chars", name_check.chars, is_dir)
+        )
+    if name_check.reserved:
+        violations.append(Violation(entry.path, "reserved_name", entry.name, is_dir))
+    if name_check.trailing:
+        violations.append(
+            Violation(entry.path, "trailing_char", entry.name[-1], is_dir)
+        )
+    if name_check.undecodable:
+        violations.append(
+            Violation(entry.path, "undecodable_name", escaped_name(entry.name), is_dir)
+        )
+
+    return violations
+
+
+def whitespace_violation(entry):
+    """
+    Leading, trailing, or double whitespace in the path, or None.
+    """
+    whitespace_count = len(WHITESPACE_PATTERN.findall(entry.path))
+    if whitespace_count == 0:
+        return None
+    return Violation(entry.path, "whitespace", whitespace_count, entry.is_dir())
+
+
+def path_length_violation(entry):
+    """
+    A path over the 255 character Windows limit, or None.
+    """
+    path_len = len(entry.path)
+    if path_len <= MAX_PATH_LEN:
+        return None
+    return Violation(entry.path, "path_length", path_len, entry.is_dir())
+
+
+def name_collisions(entries, name_key, first=None):
+    """
+    A violation for each entry whose name collides with the name of an entry
+    before it in the same directory, once both are made into keys by
+    name_key, see rules.COLLISION_KEYS. The value is the name it collides with.
+
+    first maps each (directory, key) seen to its first name, pass the same
+    dict to find collisions across calls, e.g. in a manifest.
+    """
+    if first is None:
+        first = {}
+
+    violations = []
+    for entry in entries:
+        parent = entry.path[: len(entry.path) - len(entry.name)]
+        key = (parent, name_key(entry.name))
+
+        other = first.setdefault(key, entry.name)
+        if other != entry.name:
+            violations.append(
+                Violation(entry.path, "name_collision", other, entry.is_dir())
+            )
+
+    return violations
+
+
+def entry_violations(rules, entry, whitespace=False, path_length=True, lengths=None):
+    """
+    Every violation for a single entry, in the order the report lists them.
+    lengths is a pathlength.PathLengths measuring the path on a destination,
+    by default the path itself is checked against the 255 character limit.
+    """
+    violations = []
+
+    if lengths is not None:
+        violations += lengths.check(entry)[1]
+    elif path_length:
+        violation = path_length_violation(entry)
+        if violation is not None:
+            violations.append(violation)
+
+    name_check = rules.check(entry.name)
+    if name_check is not None:
+        violations += name_violations(entry, name_check)
+
+    if whitespace:
+        violation = whitespace_violation(entry)
+        if violation is not None:
+            violations.append(violation)
+
+    return violations
+
+
+def iter_violations(root, rules, recursive=True, whitespace=False):
+    """
+    Walk root and lazily yield a Violation for each problem found, as the
+    directories are listed. Nothing is written or logged, so the caller can
+    filter the results, pipe them on or stop early.
+
+    rules is a CharRules, or just the illegal characters to look for.
+    As with the command line check, a recursive walk checks the names of
+    sub-dirs and the names and path lengths of files, skipping hidden files;
+    otherwise every entry directly under root is checked.
+    """
+    if not isinstance(rules, CharRules):
+        rules = CharRules(rules)
+
+    if recursive is not True:
+        top, dirs, files, walk_into = list_dir(root)
+        for entry in dirs + files:
+            yield from entry_violations(rules, entry, whitespace=whitespace)
+        return
+
+    for top, dirs, files in scandir_walk(root):
+        for entry in dirs:
+            yield from entry_violations(rules, entry, path_length=False)
+
+        for entry in files:
+            if not entry.name.startswith("."):
+                yield from entry_violations(rules, entry, whitespace=whitespace)
@@ -0,0 +1,226 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import signal
+import struct
+import sys
+
+from .check_path import listing_check, new_totals, report_filename, write_summary
+from .pathfilter import compile_filter
+from .pathlength import compile_lengths
+from .report import open_report
+from .rules import COLLISION_KEYS, compile_rules
+from .stats import run_stats
+from .traverse import PathEntry, list_dir
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks, from <sys/inotify.h>
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_ONLYDIR
+
+# struct inotify_event: wd, mask, cookie, len, followed by the name
+EVENT_HEADER = struct.Struct("iIII")
+
+READ_SIZE = 64 * 1024
+
+
+class WatchStopped(Exception):
+    """
+    Raised by the SIGTERM handler, to end the watch the way Ctrl-C does.
+    """
+
+
+def stop_watch(signum, frame):
+    raise WatchStopped()
+
+
+class Inotify:
+    """
+    Minimal inotify binding through ctypes, watching directories for
+    entries created or renamed into them.
+    """
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("--watch needs inotify, which is only on Linux")
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self.watches = {}
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.error(
+                    f"Out of inotify watches at {path}, "
+                    "raise fs.inotify.max_user_watches"
+                )
+            return None
+
+        # the same directory always returns the same wd, so a renamed
+        # directory just has its path updated here.
+        self.watches[wd] = path
+        return wd
+
+    def read_events(self):
+        """
+        Block until events arrive, then yield (root, name, mask) for each.
+        """
+        data = os.read(self.fd, READ_SIZE)
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            yield self.watches.get(wd), name, mask
+
+    def close(self):
+        os.close(self.fd)
+
+
+def watch_walk(args, inotify, top, path_total, illegal_total):
+    """
+    Walk a tree top-down, watching each directory before it is listed so
+    nothing created in between is missed, and check every listing.
+    """
+    check_listing = listing_check(args)
+    stack = [top]
+
+    while stack:
+        root = stack.pop()
+        inotify.add_watch(root)
+        root, dirs, files, walk_into = list_dir(root)
+        if args.path_filter is not None:
+            dirs, files, walk_into = args.path_filter.prune(
+                args.path, root, dirs, files, walk_into
+            )
+        path_total, illegal_total = check_listing(
+            args, root, dirs, files, path_total, illegal_total
+        )
+        if args.recursive is True:
+            stack.extend(os.path.join(root, name) for name in walk_into)
+
+    return path_total, illegal_total
+
+
+def watch_path(args):
+    """
+    Check the path once, then keep watching it with inotify and check each
+    entry as it is created or renamed into the tree.
+    """
+    exitcode = 0
+    path_total, illegal_total = new_totals()
+    args.rules = compile_rules(args)
+    args.path_filter = compile_filter(args)
+    args.path_lengths = compile_lengths(args)
+    args.collision_key = COLLISION_KEYS.get(args.collisions)
+    args.report_sink = open_report(report_filename(args), args.format)
+    args.run_stats = run_stats(args)
+
+    # the same checks as check_path, for a recursive check or not
+    check_listing = listing_check(args)
+
+    # a service manager stops the watch with SIGTERM, the summary is still
+    # written as it is after Ctrl-C.
+    previous_handler = signal.signal(signal.SIGTERM, stop_watch)
+
+    try:
+        inotify = Inotify()
+
+        try:
+            path_total, illegal_total = watch_walk(
+                args, inotify, args.path, path_total, illegal_total
+            )
+            args.report_sink.flush()
+            logger.info(f"Watching {len(inotify.watches)} directories for changes.")
+
+            while True:
+                for root, name, mask in inotify.read_events():
+                    if mask & IN_Q_OVERFLOW:
+                        logger.warning("inotify queue overflowed, events lost.")
+                        continue
+                    if root is None:
+                        continue
+
+                    # the event says whether it's a dir, no stat needed
+                    entry = PathEntry(root, name, bool(mask & IN_ISDIR))
+
+                    walk_into = [entry.name]
+                    if args.path_filter is not None:
+                        dirs, files, walk_into = args.path_filter.prune(
+                            args.path,
+                            root,
+                            [entry] if entry.is_dir() else [],
+                            [] if entry.is_dir() else [entry],
+                            [entry.name],
+                        )
+                        if not dirs and not files:
+                            continue
+
+                    if entry.is_dir():
+                        path_total, illegal_total = check_listing(
+                            args, root, [entry], [], path_total, illegal_total
+                        )
+                        if args.recursive is True and walk_into:
+                            path_total, illegal_total = watch_walk(
+                                args,
+                                inotify,
+                                entry.path,
+                                path_total,
+                                illegal_total,
+                            )
+                    else:
+                        path_total, illegal_total = check_listing(
+                            args, root, [], [entry], path_total, illegal_total
+                        )
+
+                # make each batch of findings visible right away
+                args.report_sink.flush()
+
+        except (KeyboardInterrupt, WatchStopped):
+            logger.info("Watch stopped.")
+
+        finally:
+            inotify.close()
+
+        write_summary(args, path_total, illegal_total)
+        return exitcode
+
+    except Exception as e:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        excp_msg = f" Exception raised: {e}\n\
+                      TYPE: {exc_type},\n\
+                      FNAME: {fname},\n\
+                      LINENO: {exc_tb.tb_lineno}\n\
+                    "
+        logger.error(excp_msg)
+        exitcode = 1
+        return exitcode
+
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        args.report_sink.close()
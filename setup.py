@@ -7,6 +7,8 @@ setup(
     install_requires=[
         "pyyaml",
     ],
+    # checks manifest-sized batches of names with vectorized lookups
+    extras_require={"numpy": ["numpy"]},
     entry_points={"console_scripts": ["icc==illegal_character_check.__main__:main"]},
     description="Check a path for illegal characters",
     long_description=README,
@@ -0,0 +1,305 @@
+"""
+Benchmark charchecker on a synthetic tree.
+
+    python -m tests.benchmark --depth 4 --fanout 6 --output bench.json
+
+Times check_path end-to-end, then illegalchar_check, the batched name check
+of a manifest, whitespace_check, path_len_check, prepare_summary and
+write_to_file on their own, and reports entries/sec and peak RSS for each so
+runs can be compared across commits.
+
+Startup is timed too: the import time of the entry points from -X importtime
+in a fresh interpreter, and the wall time of a charchecker.quick run next to
+a bare interpreter.
+"""
+import argparse
+import json
+import os
+import resource
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import charchecker
+from charchecker.__main__ import illegal_chars
+from charchecker.argparser import build_parser
+from charchecker.check_path import (
+    check_path,
+    illegalchar_check,
+    new_totals,
+    path_len_check,
+    prepare_summary,
+    whitespace_check,
+    write_to_file,
+)
+from charchecker.manifest import BATCH_SIZE
+from charchecker.report import open_report
+from charchecker.rules import compile_rules
+from charchecker.stats import NULL_STATS
+from charchecker.traverse import scandir_walk
+from charchecker.vectorized import BatchRules
+
+from .synthetic_tree import build_tree
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def checker_args(root, destination, checker_argv):
+    """
+    Parse the arguments for a recursive whitespace check the same way the
+    command line does.
+    """
+    argv = ["-p", root, "-r", "-w", "-d", destination] + checker_argv
+    args = build_parser(argv=argv)
+    args.characters = (
+        [x for x in args.characters[0]] if args.characters != 0 else illegal_chars
+    )
+    return args
+
+
+def timed(func, repeat):
+    """
+    Best wall time of func over repeat runs.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def result(phase, count, seconds):
+    return {
+        "phase": phase,
+        "entries": count,
+        "seconds": round(seconds, 6),
+        "entries_per_sec": round(count / seconds) if seconds else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def package_env():
+    """
+    Environment for a fresh interpreter that imports this charchecker.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(charchecker.__file__))
+    return env
+
+
+def import_time(module, repeat):
+    """
+    Best cumulative import time of a module in a fresh interpreter, read
+    from -X importtime.
+    """
+    best = None
+    for _ in range(repeat):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            env=package_env(),
+            check=True,
+        ).stderr
+        for line in stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                seconds = int(fields[1]) / 1e6
+                best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def startup_benchmarks(repeat=3):
+    results = []
+
+    for module in ["charchecker.__main__", "charchecker.quick"]:
+        results.append(result(f"import {module}", 1, import_time(module, repeat)))
+
+    def run(*argv):
+        subprocess.run([sys.executable] + list(argv), env=package_env())
+
+    results.append(
+        result("python -c pass", 1, timed(lambda: run("-c", "pass"), repeat))
+    )
+    results.append(
+        result(
+            "charchecker.quick",
+            1,
+            timed(lambda: run("-m", "charchecker.quick", "name.mov"), repeat),
+        )
+    )
+    return results
+
+
+def run_benchmarks(root, destination, repeat=3, checker_argv=()):
+    args = checker_args(root, destination, list(checker_argv))
+    results = []
+
+    def record(phase, count, seconds):
+        results.append(result(phase, count, seconds))
+
+    entries = [
+        entry for _, dirs, files in scandir_walk(root) for entry in dirs + files
+    ]
+    count = len(entries)
+
+    record("check_path", count, timed(lambda: check_path(args), repeat))
+
+    # the single checks run over the already listed entries
+    args.rules = compile_rules(args)
+    args.run_stats = NULL_STATS
+    args.report_sink = open_report(
+        os.path.join(destination, "bench_checks.txt"), args.format
+    )
+    path_total, illegal_total = new_totals()
+
+    with args.report_sink:
+
+        def run_illegalchar_check():
+            for entry in entries:
+                illegalchar_check(args, entry, path_total, illegal_total)
+
+        batch_rules = BatchRules(args.rules)
+        names = [entry.name for entry in entries]
+
+        def run_check_names():
+            for x in range(0, count, BATCH_SIZE):
+                batch_rules.check_names(names[x : x + BATCH_SIZE])
+
+        def run_whitespace_check():
+            for entry in entries:
+                whitespace_check(args, entry, illegal_total)
+
+        def run_path_len_check():
+            for entry in entries:
+                path_len_check(args, entry, path_total)
+
+        findings = [
+            OrderedDict({"illegal_path": Path(entry.path), "illegal_chars": ["@"]})
+            for entry in entries
+        ]
+
+        def run_write_to_file():
+            for illegal_values in findings:
+                write_to_file(args, illegal_values=illegal_values)
+            args.report_sink.flush()
+
+        record("illegalchar_check", count, timed(run_illegalchar_check, repeat))
+        record("check_names (batched)", count, timed(run_check_names, repeat))
+        record("whitespace_check", count, timed(run_whitespace_check, repeat))
+        record("path_len_check", count, timed(run_path_len_check, repeat))
+        record(
+            "prepare_summary",
+            count,
+            timed(lambda: prepare_summary(args, path_total, illegal_total), repeat),
+        )
+        record("write_to_file", count, timed(run_write_to_file, repeat))
+
+    return results
+
+
+def print_results(results):
+    print(f"{'phase':<32}{'entries':>10}{'seconds':>12}{'entries/s':>14}{'rss MB':>10}")
+    for row in results:
+        print(
+            f"{row['phase']:<32}{row['entries']:>10}{row['seconds']:>12.4f}"
+            f"{row['entries_per_sec'] or 0:>14}{row['peak_rss_mb']:>10}"
+        )
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Benchmark charchecker.")
+    parser.add_argument(
+        "--root", default=None, help="existing tree to check, skips generating one"
+    )
+    parser.add_argument("--depth", default=3, type=int)
+    parser.add_argument("--fanout", default=4, type=int)
+    parser.add_argument("--files-per-dir", default=20, type=int)
+    parser.add_argument("--name-length", default=16, type=int)
+    parser.add_argument("--illegal-density", default=0.01, type=float)
+    parser.add_argument("--whitespace-density", default=0.01, type=float)
+    parser.add_argument("--long-paths", default=5, type=int)
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--repeat", default=3, type=int)
+    parser.add_argument(
+        "--checker-args",
+        default="",
+        help='extra charchecker arguments for check_path, e.g. "--workers 8"',
+    )
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    return parser
+
+
+def main():
+    options = build_arg_parser().parse_args()
+    workdir = tempfile.mkdtemp(prefix="charchecker_bench_")
+
+    try:
+        root = options.root
+        tree = None
+        if root is None:
+            root = os.path.join(workdir, "tree")
+            tree = build_tree(
+                root,
+                depth=options.depth,
+                fanout=options.fanout,
+                files_per_dir=options.files_per_dir,
+                name_length=options.name_length,
+                illegal_density=options.illegal_density,
+                whitespace_density=options.whitespace_density,
+                long_paths=options.long_paths,
+                seed=options.seed,
+            )
+
+        destination = os.path.join(workdir, "reports")
+        os.makedirs(destination)
+
+        results = run_benchmarks(
+            root,
+            destination,
+            repeat=options.repeat,
+            checker_argv=shlex.split(options.checker_args),
+        )
+        results += startup_benchmarks(repeat=options.repeat)
+        print_results(results)
+
+        if options.output is not None:
+            with open(options.output, "w") as f:
+                json.dump(
+                    {
+                        "commit": git_commit(),
+                        "tree": vars(options) if tree is not None else root,
+                        "results": results,
+                    },
+                    f,
+                    indent=4,
+                )
+
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
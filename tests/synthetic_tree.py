@@ -0,0 +1,116 @@
+import argparse
+import os
+import random
+import string
+
+NAME_CHARS = string.ascii_letters + string.digits + "_-"
+ILLEGAL_CHARS = "@:*?!\"'<>|&#%$~+={}^"
+EXTENSIONS = [".mov", ".mxf", ".wav", ".txt", ".jpg"]
+
+
+def random_name(rng, name_length, illegal_density, whitespace_density):
+    """
+    Build one entry name, with each character illegal at illegal_density
+    and the whole name given bad whitespace at whitespace_density.
+    """
+    chars = []
+    for _ in range(name_length):
+        if rng.random() < illegal_density:
+            chars.append(rng.choice(ILLEGAL_CHARS))
+        else:
+            chars.append(rng.choice(NAME_CHARS))
+    name = "".join(chars)
+
+    if rng.random() < whitespace_density:
+        name = rng.choice([" " + name, name[:2] + "  " + name[2:], name + " "])
+
+    return name
+
+
+def build_tree(
+    root,
+    depth=3,
+    fanout=4,
+    files_per_dir=20,
+    name_length=16,
+    illegal_density=0.01,
+    whitespace_density=0.01,
+    long_paths=5,
+    seed=0,
+):
+    """
+    Generate a synthetic tree under root for benchmarking.
+    Every directory down to depth gets fanout sub-dirs and files_per_dir
+    empty files, plus long_paths files nested deep enough to go over the
+    255 character limit. Returns the number of entries created.
+    """
+    rng = random.Random(seed)
+    entries = 0
+    level = [root]
+    os.makedirs(root, exist_ok=True)
+
+    for current_depth in range(depth + 1):
+        next_level = []
+        for parent in level:
+            for index in range(files_per_dir):
+                name = random_name(
+                    rng, name_length, illegal_density, whitespace_density
+                )
+                name = f"{name}_{index}{rng.choice(EXTENSIONS)}"
+                open(os.path.join(parent, name), "w").close()
+                entries += 1
+
+            if current_depth == depth:
+                continue
+
+            for index in range(fanout):
+                name = random_name(
+                    rng, name_length, illegal_density, whitespace_density
+                )
+                path = os.path.join(parent, f"{name}_d{index}")
+                os.mkdir(path)
+                next_level.append(path)
+                entries += 1
+        level = next_level
+
+    for index in range(long_paths):
+        path = root
+        while len(path) <= 255:
+            path = os.path.join(path, "long_" + "x" * 40)
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, f"long_path_{index}.mov"), "w").close()
+        entries += 1
+
+    return entries
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic tree for charchecker benchmarks."
+    )
+    parser.add_argument("root", help="directory to create the tree in")
+    parser.add_argument("--depth", default=3, type=int)
+    parser.add_argument("--fanout", default=4, type=int)
+    parser.add_argument("--files-per-dir", default=20, type=int)
+    parser.add_argument("--name-length", default=16, type=int)
+    parser.add_argument("--illegal-density", default=0.01, type=float)
+    parser.add_argument("--whitespace-density", default=0.01, type=float)
+    parser.add_argument("--long-paths", default=5, type=int)
+    parser.add_argument("--seed", default=0, type=int)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    entries = build_tree(
+        args.root,
+        depth=args.depth,
+        fanout=args.fanout,
+        files_per_dir=args.files_per_dir,
+        name_length=args.name_length,
+        illegal_density=args.illegal_density,
+        whitespace_density=args.whitespace_density,
+        long_paths=args.long_paths,
+        seed=args.seed,
+    )
+    print(f"{entries} entries created in {args.root}")
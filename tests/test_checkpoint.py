@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from charchecker import check_path as check_path_module
+from charchecker import traverse
+from charchecker.argparser import build_parser
+from charchecker.check_path import check_path, report_filename
+from charchecker.rules import DEFAULT_CHARACTERS
+
+from .synthetic_tree import build_tree
+
+
+class Crash(BaseException):
+    pass
+
+
+def parse_args(*argv):
+    args = build_parser(argv=list(argv))
+    args.characters = list(DEFAULT_CHARACTERS)
+    return args
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    # the report name and its summary are dated, both runs get the same date
+    monkeypatch.setattr(check_path_module, "strftime", lambda *args: "DATE")
+
+    top = tmp_path / "tree"
+    build_tree(
+        str(top), depth=3, fanout=3, files_per_dir=8, illegal_density=0.05, seed=1
+    )
+    return top
+
+
+def check_args(top, destination, *argv):
+    os.makedirs(destination, exist_ok=True)
+    return parse_args("-p", str(top), "-r", "-w", "-d", str(destination), *argv)
+
+
+def read_report(args):
+    """
+    The report, with the output directory its summary names left out.
+    """
+    with open(report_filename(args), "rb") as f:
+        return f.read().replace(os.fsencode(args.destination), b"")
+
+
+@pytest.mark.parametrize("report_format", ["txt", "jsonl", "csv"])
+@pytest.mark.parametrize("listings", [1, 7, 30])
+def test_resume_matches_clean_run(
+    tree, tmp_path, monkeypatch, report_format, listings
+):
+    args = check_args(tree, tmp_path / "clean", "-f", report_format)
+    assert check_path(args) == 0
+    clean_report = read_report(args)
+
+    checkpoint = str(tmp_path / "check.json")
+    checkpoint_args = ["--checkpoint", checkpoint, "--checkpoint-interval", "0"]
+    destination = tmp_path / "resumed"
+
+    # the check dies listing a directory, after the first few were checked
+    # and checkpointed
+    list_dir = traverse.list_dir
+    calls = []
+
+    def crashing_list_dir(path):
+        if len(calls) == listings:
+            raise Crash()
+        calls.append(path)
+        return list_dir(path)
+
+    monkeypatch.setattr(traverse, "list_dir", crashing_list_dir)
+    with pytest.raises(Crash):
+        check_path(
+            check_args(tree, destination, "-f", report_format, *checkpoint_args)
+        )
+    monkeypatch.setattr(traverse, "list_dir", list_dir)
+
+    assert os.path.exists(checkpoint)
+
+    args = check_args(
+        tree, destination, "-f", report_format, "--resume", *checkpoint_args
+    )
+    assert check_path(args) == 0
+
+    assert read_report(args) == clean_report
+    assert not os.path.exists(checkpoint)
+
+
+def test_resume_refuses_other_settings(tree, tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / "check.json")
+    checkpoint_args = ["--checkpoint", checkpoint, "--checkpoint-interval", "0"]
+
+    list_dir = traverse.list_dir
+
+    def crashing_list_dir(path):
+        if path != str(tree):
+            raise Crash()
+        return list_dir(path)
+
+    monkeypatch.setattr(traverse, "list_dir", crashing_list_dir)
+    with pytest.raises(Crash):
+        check_path(check_args(tree, tmp_path, *checkpoint_args))
+    monkeypatch.setattr(traverse, "list_dir", list_dir)
+
+    args = check_args(tree, tmp_path, "--trailing", "--resume", *checkpoint_args)
+    assert check_path(args) == 1
+    assert os.path.exists(checkpoint)
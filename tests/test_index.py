@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from charchecker import check_path as check_path_module
+from charchecker import index
+from charchecker.argparser import build_parser
+from charchecker.check_path import check_path, report_filename
+from charchecker.rules import DEFAULT_CHARACTERS
+
+# an hour ago, so no directory is too recent to be cached
+OLD = 3600
+
+
+def parse_args(*argv):
+    args = build_parser(argv=list(argv))
+    args.characters = list(DEFAULT_CHARACTERS)
+    return args
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(check_path_module, "strftime", lambda *args: "DATE")
+
+    top = os.fsencode(tmp_path / "tree")
+    for path in [b"ok", b"bad\xe9dir/sub:dir", b"bad\xe9dir/more\xffdir"]:
+        os.makedirs(os.path.join(top, path))
+    for path in [b"a:b", b"ok/c", b"bad\xe9dir/d?e", b"bad\xe9dir/more\xffdir/f\xe9"]:
+        open(os.path.join(top, path), "w").close()
+
+    mtime = os.stat(top).st_mtime - OLD
+    for root, dirs, files in os.walk(top):
+        for name in dirs + files:
+            os.utime(os.path.join(root, name), (mtime, mtime))
+    os.utime(top, (mtime, mtime))
+
+    return os.fsdecode(top)
+
+
+def index_args(top, destination, db):
+    os.makedirs(destination, exist_ok=True)
+    return parse_args(
+        "-p", top, "-r", "-d", str(destination), "-f", "jsonl", "--index", str(db)
+    )
+
+
+def read_report(args):
+    with open(report_filename(args), "rb") as f:
+        return f.read().replace(os.fsencode(args.destination), b"")
+
+
+def test_index_undecodable_dirs(tree, tmp_path, monkeypatch):
+    db = tmp_path / "index.db"
+
+    args = index_args(tree, tmp_path / "first", db)
+    assert check_path(args) == 0
+    first = read_report(args)
+    assert b"bad\\\\xe9dir" in first
+
+    # everything is unchanged, nothing is listed again
+    list_dir = index.list_dir
+    listed = []
+
+    def counting_list_dir(path):
+        listed.append(path)
+        return list_dir(path)
+
+    monkeypatch.setattr(index, "list_dir", counting_list_dir)
+
+    args = index_args(tree, tmp_path / "second", db)
+    assert check_path(args) == 0
+    assert listed == []
+    assert read_report(args) == first
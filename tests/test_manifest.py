@@ -0,0 +1,46 @@
+from charchecker.manifest import manifest_entries, typed_paths
+
+
+def entries(paths, top=None):
+    return [(x.path, x.is_dir()) for x in manifest_entries(iter(paths), top=top)]
+
+
+def test_first_directory_is_checked():
+    assert entries(["bad:dir/", "bad:dir/f", "ok/g"]) == [
+        ("bad:dir", True),
+        ("bad:dir/f", False),
+        ("ok", True),
+        ("ok/g", False),
+    ]
+
+
+def test_top_is_not_checked():
+    assert entries([".", "./a:b", "./d", "./d/e"]) == [
+        ("./a:b", False),
+        ("./d", True),
+        ("./d/e", False),
+    ]
+    assert entries(["/x/top", "/x/top/a:b"], top="/x/top/") == [
+        ("/x/top/a:b", False)
+    ]
+
+
+def test_missing_parents_are_made_up():
+    assert entries(["a/b/c", "a/d"], top="") == [
+        ("a", True),
+        ("a/b", True),
+        ("a/b/c", False),
+        ("a/d", False),
+    ]
+
+
+def test_typed_empty_directory():
+    paths = ["d .", "d ./empty:dir", "f ./a", "d ./full", "f ./full/b"]
+
+    assert entries(typed_paths(paths)) == [
+        ("./empty:dir", True),
+        ("./a", False),
+        ("./full", True),
+        ("./full/b", False),
+    ]
+    assert entries(x[2:] for x in paths)[0] == ("./empty:dir", False)
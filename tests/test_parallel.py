@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from charchecker import check_path as check_path_module
+from charchecker.argparser import build_parser
+from charchecker.check_path import check_path, report_filename
+from charchecker.rules import DEFAULT_CHARACTERS
+
+from .synthetic_tree import build_tree
+
+RULES = ["-w", "--reserved-names", "--trailing", "--collisions", "both"]
+
+
+def parse_args(*argv):
+    args = build_parser(argv=list(argv))
+    args.characters = list(DEFAULT_CHARACTERS)
+    return args
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory):
+    top = tmp_path_factory.mktemp("parallel") / "tree"
+    build_tree(
+        str(top),
+        depth=3,
+        fanout=4,
+        files_per_dir=10,
+        illegal_density=0.05,
+        whitespace_density=0.05,
+        seed=2,
+    )
+    return str(top)
+
+
+@pytest.fixture(autouse=True)
+def dated(monkeypatch):
+    # the summary record is dated, every run gets the same date
+    monkeypatch.setattr(check_path_module, "strftime", lambda *args: "DATE")
+
+
+def run_check(top, destination, *argv):
+    """
+    Check the tree, returning the summary record and the sorted findings.
+    """
+    os.makedirs(destination, exist_ok=True)
+    args = parse_args("-p", top, "-r", "-d", str(destination), "-f", "jsonl", *argv)
+    assert check_path(args) == 0
+
+    with open(report_filename(args)) as f:
+        records = [json.loads(line) for line in f]
+
+    summary = [x for x in records if x.get("kind") == "summary"]
+    findings = [x for x in records if x.get("kind") != "summary"]
+    assert len(summary) == 1
+    return summary[0], sorted(findings, key=lambda x: json.dumps(x, sort_keys=True))
+
+
+@pytest.fixture(scope="module")
+def serial(tree, tmp_path_factory):
+    # module scoped, so strftime is patched here by hand
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(check_path_module, "strftime", lambda *args: "DATE")
+        return run_check(tree, tmp_path_factory.mktemp("serial"), *RULES)
+
+
+@pytest.mark.parametrize("shard_depth", ["1", "2"])
+def test_processes_match_serial(tree, serial, tmp_path, shard_depth):
+    sharded = ["--processes", "3", "--shard-depth", shard_depth]
+    summary, findings = run_check(tree, tmp_path, *sharded, *RULES)
+
+    assert findings == serial[1]
+    assert summary == serial[0]
+
+
+@pytest.mark.parametrize("workers", ["2", "8"])
+def test_workers_match_serial(tree, serial, tmp_path, workers):
+    summary, findings = run_check(tree, tmp_path, "--workers", workers, *RULES)
+
+    assert findings == serial[1]
+    assert summary == serial[0]
@@ -0,0 +1,163 @@
+import os
+
+import pytest
+
+from charchecker import remediate
+from charchecker.argparser import build_parser
+from charchecker.remediate import (
+    plan_dir,
+    remediate_path,
+    sanitize_name,
+    undo_renames,
+    unique_name,
+)
+from charchecker.rules import DEFAULT_CHARACTERS, compile_rules
+
+TREE = {
+    "clean.txt": "clean",
+    "a:b.txt": "colon",
+    "a?b.txt": "question",
+    "a_b.txt": "taken",
+    "CON.txt": "reserved",
+    "trailing. ": "trailing",
+    ".hidden:file": "hidden",
+    "dir#1/x*y.mov": "nested",
+    "dir#1/x_y.mov": "nested taken",
+    "dir#1/sub&dir/deep|name.wav": "deep",
+    "dir#1/sub&dir/empty@dir/": None,
+    "ok dir/  spaced   name.jpg": "spaced",
+}
+
+
+def parse_args(*argv):
+    args = build_parser(argv=list(argv))
+    args.characters = list(DEFAULT_CHARACTERS)
+    return args
+
+
+def build_tree(top, tree=TREE):
+    for path, content in tree.items():
+        path = os.path.join(top, path)
+        if content is None:
+            os.makedirs(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+
+
+def tree_snapshot(top):
+    """
+    Every directory and file below top, with the contents of the files.
+    """
+    snapshot = {}
+    for root, dirs, files in os.walk(top):
+        for name in dirs:
+            snapshot[os.path.relpath(os.path.join(root, name), top)] = None
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path) as f:
+                snapshot[os.path.relpath(path, top)] = f.read()
+    return snapshot
+
+
+def fix_args(top, journal):
+    rules = ["-w", "--trailing", "--reserved-names"]
+    return parse_args("-p", str(top), "-r", "--fix", "--journal", str(journal), *rules)
+
+
+def test_sanitize_name():
+    args = parse_args("-w", "--trailing", "--reserved-names")
+    args.rules = compile_rules(args)
+
+    assert sanitize_name(args, "clean.txt") == "clean.txt"
+    assert sanitize_name(args, "a:b?c.txt") == "a_b_c.txt"
+    assert sanitize_name(args, "  two   spaces .txt") == "two spaces .txt"
+    assert sanitize_name(args, "trailing. ") == "trailing"
+    assert sanitize_name(args, "CON.txt") == "CON_.txt"
+    assert sanitize_name(args, "...") == "_"
+
+
+def test_unique_name_numbering():
+    assert unique_name("a_b.txt", set()) == "a_b.txt"
+    assert unique_name("a_b.txt", {"a_b.txt"}) == "a_b_1.txt"
+    assert unique_name("a_b.txt", {"a_b.txt", "a_b_1.txt"}) == "a_b_2.txt"
+    assert unique_name("A_B.TXT", {"a_b.txt"}) == "A_B_1.TXT"
+    assert unique_name("noext", {"noext"}) == "noext_1"
+
+
+def test_plan_dir_numbers_collisions():
+    args = parse_args()
+    args.rules = compile_rules(args)
+
+    renames = plan_dir(args, "top", [], ["a:b.txt", "a?b.txt", "a_b.txt", ".x:y"])
+
+    assert renames == [("a:b.txt", "a_b_1.txt"), ("a?b.txt", "a_b_2.txt")]
+
+
+def test_fix_then_undo_restores_tree(tmp_path):
+    top = tmp_path / "top"
+    build_tree(top)
+    before = tree_snapshot(top)
+
+    args = fix_args(top, tmp_path / "renames.jsonl")
+    assert remediate_path(args) == 0
+
+    fixed = tree_snapshot(top)
+    assert fixed != before
+    assert sorted(fixed.values(), key=str) == sorted(before.values(), key=str)
+    assert "a_b.txt" in fixed and fixed["a_b.txt"] == "taken"
+    assert ".hidden:file" in fixed
+    for path in fixed:
+        for name in path.split(os.sep):
+            if name.startswith("."):
+                continue
+            assert not set(name) & set(DEFAULT_CHARACTERS), path
+            assert name == " ".join(name.split()), path
+
+    args = parse_args("--undo", str(tmp_path / "renames.jsonl"))
+    assert undo_renames(args) == 0
+    assert tree_snapshot(top) == before
+
+
+class Crash(BaseException):
+    pass
+
+
+def test_resume_truncated_journal(tmp_path, monkeypatch):
+    build_tree(tmp_path / "clean")
+    args = fix_args(tmp_path / "clean", tmp_path / "clean.jsonl")
+    assert remediate_path(args) == 0
+    expected = tree_snapshot(tmp_path / "clean")
+
+    top = tmp_path / "top"
+    build_tree(top)
+    before = tree_snapshot(top)
+    journal = tmp_path / "renames.jsonl"
+
+    # the run dies after three renames
+    rename = os.rename
+    calls = []
+
+    def crashing_rename(src, dst):
+        if len(calls) == 3:
+            raise Crash()
+        calls.append(src)
+        rename(src, dst)
+
+    monkeypatch.setattr(remediate.os, "rename", crashing_rename)
+    with pytest.raises(Crash):
+        remediate_path(fix_args(top, journal))
+    monkeypatch.setattr(remediate.os, "rename", rename)
+
+    # and the last record was cut short as it was written
+    records = journal.read_text().splitlines(keepends=True)
+    assert sum('"op": "done"' in x for x in records) == 3
+    journal.write_text("".join(records[:-1]) + records[-1][:20])
+
+    assert remediate_path(fix_args(top, journal)) == 0
+    assert tree_snapshot(top) == expected
+
+    args = parse_args("--undo", str(journal))
+    assert undo_renames(args) == 0
+    assert tree_snapshot(top) == before
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from charchecker.rules import DEFAULT_CHARACTERS, RESERVED_NAMES, CharRules
+from charchecker.vectorized import MIN_BATCH, BatchRules
+
+numpy = pytest.importorskip("numpy")
+
+NAME_CHARS = (
+    list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-. ")
+    + DEFAULT_CHARACTERS
+    # accented, other scripts, upper-cased to ascii, symbols, a zero width
+    # space, a no-break space and a private use character
+    + ["é", "É", "ß", "日本", "ı", "ſ", "€", "©", "​", " ", ""]
+)
+
+# names that aren't valid UTF-8 on disk, as listed with surrogate escapes
+UNDECODABLE = [b"caf\xe9", b"\xff\xfe", b"ok\x80.txt"]
+
+RULES = {
+    "characters": dict(characters=DEFAULT_CHARACTERS),
+    "non-ascii characters": dict(characters=DEFAULT_CHARACTERS + ["é", "€"]),
+    "categories": dict(characters=[], categories=("S", "Cf", "Zs", "Co")),
+    "reserved": dict(characters=DEFAULT_CHARACTERS, reserved_names=True),
+    "trailing": dict(characters=DEFAULT_CHARACTERS, trailing=True),
+    "everything": dict(
+        characters=DEFAULT_CHARACTERS,
+        categories=("S", "Cf"),
+        reserved_names=True,
+        trailing=True,
+    ),
+}
+
+
+def random_name(rng):
+    kind = rng.random()
+    if kind < 0.15:
+        # a reserved name in any case, maybe with an extension
+        stem = "".join(
+            x.lower() if rng.random() < 0.5 else x
+            for x in rng.choice(sorted(RESERVED_NAMES))
+        )
+        return stem + rng.choice(["", ".txt", " .mov", ".", "x", "1"])
+    if kind < 0.2:
+        return rng.choice(["", "a", "ab", ".", " ", "..", "CO", "LP"])
+
+    length = rng.randint(1, 24)
+    return "".join(rng.choice(NAME_CHARS) for _ in range(length))
+
+
+def random_batch(rng, undecodable=False):
+    names = [random_name(rng) for _ in range(rng.randint(MIN_BATCH, 4 * MIN_BATCH))]
+    if undecodable:
+        for _ in range(rng.randint(1, 3)):
+            name = rng.choice(UNDECODABLE).decode("utf-8", "surrogateescape")
+            names.insert(rng.randrange(len(names) + 1), name)
+    return names
+
+
+@pytest.mark.parametrize("rules", RULES.values(), ids=RULES.keys())
+def test_check_names_matches_check(rules):
+    rules = CharRules(**rules)
+    batch_rules = BatchRules(rules)
+    rng = random.Random(0)
+
+    for x in range(200):
+        names = random_batch(rng, undecodable=x % 10 == 0)
+        assert batch_rules.check_names(names) == [rules.check(n) for n in names]
+
+
+def test_check_names_small_batch():
+    rules = CharRules(DEFAULT_CHARACTERS, reserved_names=True, trailing=True)
+    names = ["a:b", "clean", "con.txt", "end."]
+
+    assert BatchRules(rules).check_names(names) == [rules.check(n) for n in names]